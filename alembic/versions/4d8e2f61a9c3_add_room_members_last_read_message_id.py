@@ -0,0 +1,30 @@
+"""add room_members last_read_message_id
+
+Revision ID: 4d8e2f61a9c3
+Revises: 7c1e4a9d2b63
+Create Date: 2026-10-17 14:02:18.552907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d8e2f61a9c3'
+down_revision: Union[str, Sequence[str], None] = '7c1e4a9d2b63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "room_members",
+        sa.Column("last_read_message_id", sa.Integer(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("room_members") as batch_op:
+        batch_op.drop_column("last_read_message_id")
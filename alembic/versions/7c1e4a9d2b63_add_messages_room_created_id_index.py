@@ -0,0 +1,30 @@
+"""add messages room_id/created_at/id index
+
+Revision ID: 7c1e4a9d2b63
+Revises: 00ea24364b3c
+Create Date: 2026-10-17 10:12:41.305118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e4a9d2b63'
+down_revision: Union[str, Sequence[str], None] = '00ea24364b3c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_messages_room_created_id",
+        "messages",
+        ["room_id", "created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_messages_room_created_id", table_name="messages")
@@ -0,0 +1,60 @@
+"""add messages full-text search index
+
+Revision ID: 9a3b7c5e1f20
+Revises: 4d8e2f61a9c3
+Create Date: 2026-10-17 14:31:52.804116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a3b7c5e1f20'
+down_revision: Union[str, Sequence[str], None] = '4d8e2f61a9c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_messages_content_tsv "
+            "ON messages USING gin (to_tsvector('simple', content))"
+        )
+    elif dialect == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts "
+            "USING fts5(content, content='messages', content_rowid='id')"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS messages_fts_ai AFTER INSERT ON messages BEGIN "
+            "INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS messages_fts_ad AFTER DELETE ON messages BEGIN "
+            "INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS messages_fts_au AFTER UPDATE OF content ON messages BEGIN "
+            "INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+            "INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content); END"
+        )
+        # 기존 메시지로 색인 채우기
+        op.execute("INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_messages_content_tsv")
+    elif dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS messages_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS messages_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS messages_fts_ai")
+        op.execute("DROP TABLE IF EXISTS messages_fts")
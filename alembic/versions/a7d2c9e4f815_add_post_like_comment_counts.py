@@ -0,0 +1,38 @@
+"""add posts.like_count / comment_count
+
+Revision ID: a7d2c9e4f815
+Revises: e3a6d0c84b17
+Create Date: 2026-10-17 16:12:47.903316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d2c9e4f815'
+down_revision: Union[str, Sequence[str], None] = 'e3a6d0c84b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("posts", sa.Column("like_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("posts", sa.Column("comment_count", sa.Integer(), nullable=False, server_default="0"))
+
+    # 기존 게시글 개수 채우기
+    op.execute(
+        """
+        UPDATE posts SET
+            like_count = (SELECT COUNT(*) FROM post_likes WHERE post_likes.post_id = posts.id),
+            comment_count = (SELECT COUNT(*) FROM post_comments WHERE post_comments.post_id = posts.id)
+        """
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("posts") as batch_op:
+        batch_op.drop_column("comment_count")
+        batch_op.drop_column("like_count")
@@ -0,0 +1,30 @@
+"""add posts group_id/created_at/id index
+
+Revision ID: b1f4e8a23c60
+Revises: a7d2c9e4f815
+Create Date: 2026-10-17 16:48:05.227614
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1f4e8a23c60'
+down_revision: Union[str, Sequence[str], None] = 'a7d2c9e4f815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_posts_group_created_id",
+        "posts",
+        ["group_id", "created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_posts_group_created_id", table_name="posts")
@@ -0,0 +1,42 @@
+"""add background_jobs
+
+Revision ID: c5f19e0d7b42
+Revises: 9a3b7c5e1f20
+Create Date: 2026-10-17 15:06:27.190442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f19e0d7b42'
+down_revision: Union[str, Sequence[str], None] = '9a3b7c5e1f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "background_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(length=64), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_background_jobs_status_updated",
+        "background_jobs",
+        ["status", "updated_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_background_jobs_status_updated", table_name="background_jobs")
+    op.drop_table("background_jobs")
@@ -0,0 +1,51 @@
+"""unique post_likes (post_id, user_id)
+
+Revision ID: d94b6f2e0a38
+Revises: b1f4e8a23c60
+Create Date: 2026-10-17 17:20:36.614082
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd94b6f2e0a38'
+down_revision: Union[str, Sequence[str], None] = 'b1f4e8a23c60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 예전 토글 경합으로 생긴 중복 좋아요 정리 (가장 먼저 누른 것만 남김) → 개수 다시 계산
+    op.execute(
+        """
+        DELETE FROM post_likes
+        WHERE id NOT IN (SELECT MIN(id) FROM post_likes GROUP BY post_id, user_id)
+        """
+    )
+    op.execute(
+        """
+        UPDATE posts SET
+            like_count = (SELECT COUNT(*) FROM post_likes WHERE post_likes.post_id = posts.id)
+        """
+    )
+
+    op.drop_index("ix_post_likes_post_user", table_name="post_likes")
+    op.create_index(
+        "uq_post_likes_post_user",
+        "post_likes",
+        ["post_id", "user_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_post_likes_post_user", table_name="post_likes")
+    op.create_index(
+        "ix_post_likes_post_user",
+        "post_likes",
+        ["post_id", "user_id"],
+    )
@@ -0,0 +1,36 @@
+"""add post_likes / post_comments post_id indexes
+
+Revision ID: e3a6d0c84b17
+Revises: c5f19e0d7b42
+Create Date: 2026-10-17 15:41:18.512904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a6d0c84b17'
+down_revision: Union[str, Sequence[str], None] = 'c5f19e0d7b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_post_likes_post_user",
+        "post_likes",
+        ["post_id", "user_id"],
+    )
+    op.create_index(
+        "ix_post_comments_post_created_id",
+        "post_comments",
+        ["post_id", "created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_post_comments_post_created_id", table_name="post_comments")
+    op.drop_index("ix_post_likes_post_user", table_name="post_likes")
@@ -0,0 +1,51 @@
+"""unique room_members (room_id, user_id)
+
+Revision ID: f6c3a1d8b947
+Revises: d94b6f2e0a38
+Create Date: 2026-10-17 18:05:12.331904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6c3a1d8b947'
+down_revision: Union[str, Sequence[str], None] = 'd94b6f2e0a38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 예전 읽음 처리(UPDATE 후 없으면 INSERT) 경합으로 생긴 중복 행 정리
+    # → 가장 먼저 만든 행에 가장 앞선 읽음 위치를 모으고 나머지는 삭제
+    op.execute(
+        """
+        UPDATE room_members SET last_read_message_id = (
+            SELECT MAX(dup.last_read_message_id) FROM room_members dup
+            WHERE dup.room_id = room_members.room_id AND dup.user_id = room_members.user_id
+        )
+        WHERE id IN (
+            SELECT MIN(id) FROM room_members GROUP BY room_id, user_id HAVING COUNT(*) > 1
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM room_members
+        WHERE id NOT IN (SELECT MIN(id) FROM room_members GROUP BY room_id, user_id)
+        """
+    )
+
+    op.create_index(
+        "uq_room_members_room_user",
+        "room_members",
+        ["room_id", "user_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_room_members_room_user", table_name="room_members")
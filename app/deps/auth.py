@@ -1,30 +1,61 @@
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
 
-from app.database import get_db
-from app.models.user import User
 from app.utils.security import decode_access_token
+from app.utils.user_cache import CachedUser, get_user_by_email, get_user_by_id
 
 _bearer = HTTPBearer(auto_error=False)
 
-def current_user(
+
+def resolve_user(payload: dict, load: bool = True) -> CachedUser | None:
+    """
+    토큰 claims → 유저 스냅샷.
+    uid 가 있으면 id 로, uid 없는 예전 토큰은 sub(email) 로 찾는다.
+    load=False 면 캐시에 있을 때만 돌려준다 (DB 안 씀).
+    """
+    email = payload.get("sub")
+    if not email:
+        return None
+    uid = payload.get("uid")
+    if uid is None:
+        return get_user_by_email(email, load)
+    try:
+        user = get_user_by_id(int(uid), load)
+    except (TypeError, ValueError):
+        return None
+    # 토큰 발급 후 탈퇴/재가입 등으로 id 와 email 이 어긋나면 무효
+    if user is None or user.email != email:
+        return None
+    return user
+
+
+async def current_user(
+    request: Request,
     creds: HTTPAuthorizationCredentials = Depends(_bearer),
-    db: Session = Depends(get_db),
-) -> User:
+) -> CachedUser:
+    """
+    로그인 유저 스냅샷(CachedUser: id/email/name/nickname/is_active/profile_image_url).
+    ORM 객체가 아니므로 수정이 필요하면 db.get(User, user.id) 로 가져와서 쓸 것.
+    한 요청 안에서는 request.state 에 기억해 두고 다시 풀지 않는다.
+    """
+    cached = getattr(request.state, "user", None)
+    if cached is not None:
+        return cached
+
     if creds is None or creds.scheme.lower() != "bearer":
         raise HTTPException(status_code=401, detail="Missing or invalid token")
     try:
         payload = decode_access_token(creds.credentials)
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token")
-
-    email = payload.get("sub")
-    if not email:
+    if not payload.get("sub"):
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.execute(select(User).where(User.email == email)).scalar_one_or_none()
+    # 캐시 히트면 그 자리에서, 미스일 때만 스레드풀에서 DB 조회 (이벤트 루프 막지 않게)
+    user = resolve_user(payload, load=False) or await run_in_threadpool(resolve_user, payload)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
+
+    request.state.user = user
     return user
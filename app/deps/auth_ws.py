@@ -1,16 +1,15 @@
 # app/deps/auth_ws.py
-from fastapi import WebSocket, WebSocketException, status, Depends
-from sqlalchemy.orm import Session
+from fastapi import WebSocket, WebSocketException, status
+from starlette.concurrency import run_in_threadpool
 import jwt  # PyJWT
 
-from app.database import get_db
-from app.models.user import User
 from app.utils.security import decode_access_token  # 네가 만든 util
+from app.deps.auth import resolve_user
+from app.utils.user_cache import CachedUser
 
 async def get_current_user_ws(
     websocket: WebSocket,
-    db: Session = Depends(get_db),
-) -> User:
+) -> CachedUser:
     # 1) 쿼리스트링에서 token=? 읽기
     token = websocket.query_params.get("token")
     if not token:
@@ -23,12 +22,13 @@ async def get_current_user_ws(
         # 토큰이 유효하지 않으면 WebSocket 정책 위반 코드로 끊기
         raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION)
 
-    # 👉 로그인 때 create_access_token({"sub": user.email}) 썼으니까
-    email = payload.get("sub")
-    if not email:
+    # 👉 로그인 때 create_access_token({"sub": user.email, "uid": user.id}) 썼으니까
+    if not payload.get("sub"):
         raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION)
 
-    user = db.query(User).filter(User.email == email).first()
+    # 3) 짧은 TTL 유저 캐시 → 미스일 때만 DB (세션은 조회 직후 바로 닫힘)
+    #    소켓이 살아있는 동안 DB 커넥션을 붙잡고 있지 않음
+    user = resolve_user(payload, load=False) or await run_in_threadpool(resolve_user, payload)
     if not user:
         raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION)
 
@@ -1,5 +1,6 @@
 # app/main.py
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
@@ -17,6 +18,10 @@ from app.routers import image as image_router
 
 from app.routers import rooms, messages  # etc...
 from app.websocket import endpoints as ws_endpoints
+from app.websocket.manager import manager as ws_manager
+from app.services.message_service import message_writer
+from app.services.job_queue import job_queue
+from app.utils.mailer import mailer
 from app.routers import calendar as calendar_router
 from app.routers import post as post_router
 
@@ -24,9 +29,24 @@ from app.routers import post as post_router
 # 1) DB 초기화
 Base.metadata.create_all(bind=engine)
 
+# 1-1) 앱 수명주기: 채팅 백플레인, 메시지 writer, 백그라운드 작업 큐 등 시작/정리
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await ws_manager.start()
+    message_writer.start()
+    await job_queue.start()
+    try:
+        yield
+    finally:
+        await job_queue.stop()  # 큐에 남은 작업 처리
+        mailer.close()  # 남은 메일 발송 + SMTP 연결 종료
+        await message_writer.stop()  # 남은 메시지 flush
+        await ws_manager.stop()
+
 # 2) 앱 생성
 app = FastAPI(
     title="Auth API Example",
+    lifespan=lifespan,
     openapi_url="/api/v1/openapi.json",
     docs_url="/api/v1/docs",
     redoc_url="/api/v1/redoc",
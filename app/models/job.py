@@ -0,0 +1,27 @@
+# app/models/job.py
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from app.database import Base
+
+
+class BackgroundJob(Base):
+    """
+    백그라운드 작업 영속화용 (JOB_PERSIST=1 일 때만 사용).
+    끝난 작업은 지우고, 실패/미처리 작업만 남는다 → 재시작 시 pending 을 다시 실행.
+    """
+    __tablename__ = "background_jobs"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(64), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON 인자
+    # pending / running / failed
+    status = Column(String(16), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        Index("ix_background_jobs_status_updated", "status", "updated_at"),
+    )
@@ -1,6 +1,6 @@
 # app/models/message.py
 from datetime import datetime, timezone  # ✅ 이렇게 바꿈!
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, DDL, event
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -20,3 +20,40 @@ class Message(Base):
 
     room = relationship("ChatRoom", back_populates="messages")
     user = relationship("User")
+
+    __table_args__ = (
+        # 방별 최신/이전 메시지 keyset 페이지네이션용 (room_id 고정 + (created_at, id) 범위 스캔)
+        Index("ix_messages_room_created_id", "room_id", "created_at", "id"),
+    )
+
+
+# ─────────────────────────────────────
+# 🔍 메시지 전문 검색 인덱스
+# - PostgreSQL: to_tsvector('simple', content) GIN 인덱스 (쓰기 시 DB 가 알아서 갱신)
+# - SQLite(로컬): FTS5 external-content 테이블 + INSERT/DELETE/UPDATE 트리거로 동기화
+# 테이블을 create_all 로 처음 만들 때 같이 생성, 기존 DB 는 alembic 마이그레이션으로 추가
+# ─────────────────────────────────────
+MESSAGE_SEARCH_TS_CONFIG = "simple"  # 한국어 사전이 없으므로 형태소 분석 없이 토큰 단위
+
+_PG_SEARCH_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_messages_content_tsv "
+    f"ON messages USING gin (to_tsvector('{MESSAGE_SEARCH_TS_CONFIG}', content))",
+]
+
+_SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts "
+    "USING fts5(content, content='messages', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS messages_fts_ai AFTER INSERT ON messages BEGIN "
+    "INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS messages_fts_ad AFTER DELETE ON messages BEGIN "
+    "INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS messages_fts_au AFTER UPDATE OF content ON messages BEGIN "
+    "INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+    "INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content); END",
+]
+
+for _stmt in _PG_SEARCH_DDL:
+    event.listen(Message.__table__, "after_create", DDL(_stmt).execute_if(dialect="postgresql"))
+for _stmt in _SQLITE_SEARCH_DDL:
+    event.listen(Message.__table__, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+event.listen(Message.__table__, "after_drop", DDL("DROP TABLE IF EXISTS messages_fts").execute_if(dialect="sqlite"))
@@ -1,5 +1,5 @@
 # app/models/post.py
-from sqlalchemy import JSON, Column, Integer, String, Text, ForeignKey, DateTime, func
+from sqlalchemy import JSON, Column, Integer, String, Text, ForeignKey, DateTime, Index, func
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -7,6 +7,10 @@ from app.database import Base
 
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        # 그룹 피드 keyset 페이지네이션용 (group_id 고정 + (created_at, id) 범위 스캔)
+        Index("ix_posts_group_created_id", "group_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     group_id = Column(Integer, ForeignKey("groups.id"), nullable=False)
@@ -19,6 +23,12 @@ class Post(Base):
     # thumbnail_url = Column(String(500), nullable=True)
     image_urls = Column(JSON, nullable=False, default=list)
 
+    # 피드/상세에서 매번 COUNT 하지 않도록 비정규화한 개수
+    # (post_service 에서 좋아요/댓글 추가·삭제와 같은 트랜잭션에서 +1/-1,
+    #  어긋나면 python -m app.scripts.reconcile_post_counts 로 다시 맞춤)
+    like_count = Column(Integer, nullable=False, default=0, server_default="0")
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
@@ -36,6 +46,10 @@ class Post(Base):
 
 class PostLike(Base):
     __tablename__ = "post_likes"
+    __table_args__ = (
+        # 한 사람당 한 번 (좋아요 upsert 의 ON CONFLICT 대상) + 내가 눌렀는지(EXISTS) 를 인덱스만으로
+        Index("uq_post_likes_post_user", "post_id", "user_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     post_id = Column(Integer, ForeignKey("posts.id"), nullable=False)
@@ -49,6 +63,10 @@ class PostLike(Base):
 
 class PostComment(Base):
     __tablename__ = "post_comments"
+    __table_args__ = (
+        # 게시글별 댓글 수 + 작성순 정렬
+        Index("ix_post_comments_post_created_id", "post_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     post_id = Column(Integer, ForeignKey("posts.id"), nullable=False)
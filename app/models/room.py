@@ -7,6 +7,7 @@ from sqlalchemy import (
     DateTime,
     func,
     UniqueConstraint,  # ✅ 추가
+    Index,
 )
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -43,10 +44,16 @@ class ChatRoom(Base):
 
 class RoomMember(Base):
     __tablename__ = "room_members"
+    __table_args__ = (
+        # 방마다 한 사람당 한 행 (입장/읽음 upsert 의 ON CONFLICT 대상)
+        Index("uq_room_members_room_user", "room_id", "user_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     room_id = Column(Integer, ForeignKey("chat_rooms.id", ondelete="CASCADE"))
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    # 이 유저가 마지막으로 읽은 메시지 id (안 읽은 수 = 이보다 큰 id 의 남이 쓴 메시지 수)
+    last_read_message_id = Column(Integer, nullable=True)
 
     room = relationship("ChatRoom", back_populates="members")
     user = relationship("User")
@@ -7,17 +7,35 @@ from app.services.auth_service import create_user, authenticate_user
 from app.utils.file_utils import save_profile_image
 from app.utils.security import create_access_token
 from app.services.auth_service import request_email_code, confirm_email_code, ensure_recent_verified
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.utils.security import decode_access_token
+from app.services.post_service import release_user_counts
 from sqlalchemy import select, func
 from app.models.user import User
 from app.models.group import Group
+from app.deps.auth import current_user
+from app.utils.user_cache import CachedUser, cache_user, invalidate_user
 from fastapi import status
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-# Bearer 인증 디펜던시
-bearer = HTTPBearer(auto_error=False)
+
+def _user_out(user: User | CachedUser) -> dict:
+    # /auth/me, 닉네임/프로필 변경 응답 공통 형태
+    return {
+        "id": user.id,
+        "email": user.email,
+        "name": user.name,
+        "nickname": user.nickname,
+        "is_active": user.is_active,
+        "profile_image_url": user.profile_image_url,
+    }
+
+
+def _load_user(db: Session, user: CachedUser) -> User:
+    # 수정이 필요한 라우트만 ORM 객체를 PK 로 가져옴
+    row = db.get(User, user.id)
+    if not row:
+        raise HTTPException(status_code=404, detail="User not found")
+    return row
 
 # 인증코드 발송
 @router.post("/email/request")
@@ -72,7 +90,7 @@ async def signup(
         # 기존 로직 재사용
         user = create_user(db, body)
 
-        access_token = create_access_token({"sub": user.email})
+        access_token = create_access_token({"sub": user.email, "uid": user.id})
 
         return {
             "access_token": access_token,
@@ -89,27 +107,16 @@ def login(body: UserLogin, db: Session = Depends(get_db)):
     user = authenticate_user(db, body.email, body.password)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    token = create_access_token({"sub": user.email})
+    token = create_access_token({"sub": user.email, "uid": user.id})
     return {"access_token": token, "token_type": "bearer"}
 
 # 회원 탈퇴
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
 def delete_account(
-    creds: HTTPAuthorizationCredentials = Depends(bearer),
+    me: CachedUser = Depends(current_user),
     db: Session = Depends(get_db)
 ):
-    if creds is None or creds.scheme.lower() != "bearer":
-        raise HTTPException(status_code=401, detail="Missing or invalid token")
-    
-    try:
-        payload = decode_access_token(creds.credentials)
-    except Exception:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    
-    email = payload.get("sub")
-    user = db.execute(select(User).where(User.email == email)).scalar_one_or_none()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    user = _load_user(db, me)
 
     # 방장으로 있는 그룹 수 확인
     owned_group_count = db.scalar(
@@ -122,95 +129,44 @@ def delete_account(
             detail="방장으로 있는 그룹이 있어서 탈퇴할 수 없습니다. 그룹을 삭제하거나 방장을 위임한 후 다시 시도해 주세요."
         )
     
+    # cascade 로 같이 지워질 좋아요/댓글만큼 다른 사람 글의 개수 차감
+    release_user_counts(db, user.id)
     db.delete(user)
     db.commit()
+    invalidate_user(me.id, me.email)
     return
 
-# 보호 라우트: 현재 로그인 사용자 정보
+# 보호 라우트: 현재 로그인 사용자 정보 (캐시된 스냅샷 그대로, DB 안 씀)
 @router.get("/me")
-def me(
-    creds: HTTPAuthorizationCredentials = Depends(bearer),
-    db: Session = Depends(get_db),
-):
-    if creds is None or creds.scheme.lower() != "bearer":
-        raise HTTPException(status_code=401, detail="Missing or invalid token")
-    try:
-        payload = decode_access_token(creds.credentials)
-    except Exception:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    email = payload.get("sub")
-    if not email:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    user = db.execute(select(User).where(User.email == email)).scalar_one_or_none()
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
-
-    return {"id": user.id, "email": user.email, "name": user.name, "nickname":user.nickname, "is_active": user.is_active, "profile_image_url": user.profile_image_url}
+def me(user: CachedUser = Depends(current_user)):
+    return _user_out(user)
 
 # 닉네임 변경
 @router.patch("/me/nickname")
 def update_nickname(
     body: NicknameUpdate,
-    creds: HTTPAuthorizationCredentials = Depends(bearer),
+    me: CachedUser = Depends(current_user),
     db: Session = Depends(get_db),
 ):
-    # 토큰 체크
-    if creds is None or creds.scheme.lower() != "bearer":
-        raise HTTPException(status_code=401, detail="Missing or invalid token")
-
-    try:
-        payload = decode_access_token(creds.credentials)
-    except Exception:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    email = payload.get("sub")
-    if not email:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    user = db.execute(select(User).where(User.email == email)).scalar_one_or_none()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    user = _load_user(db, me)
 
     # 닉네임 수정
     user.nickname = body.nickname
     db.commit()
     db.refresh(user)
 
-    # /auth/me랑 같은 형태로 돌려주기
-    return {
-        "id": user.id,
-        "email": user.email,
-        "name": user.name,
-        "nickname": user.nickname,
-        "is_active": user.is_active,
-        "profile_image_url": user.profile_image_url,
-    }
+    # /auth/me랑 같은 형태로 돌려주기 (캐시도 새 값으로)
+    return _user_out(cache_user(user))
 
 # 프로필 수정
 @router.patch("/me/profile-image")
 async def update_profile_image(
     profile_image: UploadFile = File(...),
-    creds: HTTPAuthorizationCredentials = Depends(bearer),
+    me: CachedUser = Depends(current_user),
     db: Session = Depends(get_db),
 ):
-    # 토큰 체크
-    if creds is None or creds.scheme.lower() != "bearer":
-      raise HTTPException(status_code=401, detail="Missing or invalid token")
+    user = _load_user(db, me)
 
-    try:
-      payload = decode_access_token(creds.credentials)
-    except Exception:
-      raise HTTPException(status_code=401, detail="Invalid token")
-
-    email = payload.get("sub")
-    if not email:
-      raise HTTPException(status_code=401, detail="Invalid token")
-
-    user = db.execute(select(User).where(User.email == email)).scalar_one_or_none()
-    if not user:
-      raise HTTPException(status_code=404, detail="User not found")
-  
     old_url = user.profile_image_url
     profile_image_url = await save_profile_image(profile_image, old_url=old_url)
 
@@ -219,11 +175,4 @@ async def update_profile_image(
     db.refresh(user)
 
     # /auth/me와 형태 맞춰서 리턴 (profile_image_url 포함!)
-    return {
-        "id": user.id,
-        "email": user.email,
-        "name": user.name,
-        "nickname": user.nickname,
-        "is_active": user.is_active,
-        "profile_image_url": user.profile_image_url,
-    }
\ No newline at end of file
+    return _user_out(cache_user(user))
@@ -8,14 +8,17 @@ from app.models.user import User
 # from app.security import create_access_token, create_refresh_token  # 네가 쓰던 함수
 
 # --- (선택) Supabase JWT 검증 유틸 ---
-import requests, time
+import os
 import jwt  # PyJWT
-from jwt.algorithms import RSAAlgorithm
+from app.utils.jwks import JWKSCache
 
-SUPABASE_PROJECT_REF = "YOUR_PROJECT_REF"  # 예: "abcd1234"
+SUPABASE_PROJECT_REF = os.getenv("SUPABASE_PROJECT_REF", "YOUR_PROJECT_REF")  # 예: "abcd1234"
 SUPABASE_JWKS_URL = f"https://{SUPABASE_PROJECT_REF}.auth.supabase.co/.well-known/jwks.json"
 SUPABASE_ISS = f"https://{SUPABASE_PROJECT_REF}.auth.supabase.co/"
 
+# kid -> 공개키 캐시 (요청마다 JWKS 를 받지 않음)
+supabase_jwks = JWKSCache(SUPABASE_JWKS_URL)
+
 class ExchangeIn(BaseModel):
     supabase_token: str
 
@@ -29,19 +32,14 @@ def verify_supabase_jwt(token: str) -> dict:
         if not kid:
             raise ValueError("Missing kid")
 
-        # 2) JWKS 받아서 해당 kid 키 찾기 (캐싱 권장)
-        jwks = requests.get(SUPABASE_JWKS_URL, timeout=5).json()
-        key = next((k for k in jwks["keys"] if k["kid"] == kid), None)
-        if not key:
-            raise ValueError("JWK not found")
-
-        public_key = RSAAlgorithm.from_jwk(key)
+        # 2) 캐시에서 kid 에 해당하는 공개키 (모르는 kid 일 때만 JWKS 다시 받음)
+        jwk = supabase_jwks.get_key(kid)
 
         # 3) 검증 (aud는 프로젝트 세팅에 따라 필요할 수 있음)
         payload = jwt.decode(
             token,
-            public_key,
-            algorithms=["RS256"],
+            jwk.key,
+            algorithms=["RS256", "ES256"],
             options={"require": ["exp", "iat", "iss"]},
             issuer=SUPABASE_ISS,
             audience=None,  # 필요 시 설정
@@ -14,7 +14,7 @@ router = APIRouter(prefix="/boards", tags=["boards"])
 async def put_mapping(group_id: int, body: BoardMapIn, db: Session = Depends(get_db)):
     row, code = await board_service.upsert_mapping(db, group_id, body.mid)
     url = board_service.build_url(row.mid)
-    exists = await board_service.url_exists(url)  # 여전히 선택적 검사
+    exists = await board_service.url_exists_cached(url)  # 여전히 선택적 검사
     return JSONResponse(
         status_code=code,
         content={"groupId": group_id, "mid": row.mid, "url": url, "exists": exists},
@@ -33,6 +33,6 @@ async def get_url(group_id: int, db: Session = Depends(get_db)):
     # 2) group_id 기반으로 mid / url 계산
     mid = board_service.build_mid(group_id)
     url = board_service.build_url_from_group_id(group_id)
-    exists_flag = await board_service.url_exists(url)
+    exists_flag = await board_service.url_exists_cached(url)
 
     return BoardMapOut(groupId=group_id, mid=mid, url=url, exists=exists_flag)
\ No newline at end of file
@@ -26,12 +26,10 @@ from sqlalchemy.orm import Session, joinedload
 # ── 로컬 모듈
 from app.database import get_db
 from app.deps.auth import current_user
+from app.utils.user_cache import CachedUser
 from app.models.board_registry import BoardRegistry
 from app.models.group import Group
 from app.models.group_member import GroupMember, GroupRole
-from app.models.message import Message
-from app.models.room import ChatRoom, RoomMember
-from app.models.user import User
 from app.schemas.group import (
     GroupMemberOut,
     GroupResponse,
@@ -47,6 +45,8 @@ from app.services.group_service import create_group
 import traceback
 
 from app.services.invite_service import PURPOSE_GROUP_JOIN, redeem_invite
+from app.websocket.manager import manager as ws_manager
+from app.websocket.membership import membership_index
 
 # ────────────────────────────────────────────────────────────────────────────────
 # 라우터 설정
@@ -71,7 +71,7 @@ UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 def create_group_api(
     response: Response,
     db: Session = Depends(get_db),
-    user: User = Depends(current_user),
+    user: CachedUser = Depends(current_user),
 
     name: str = Form(...),
     description: str | None = Form(None),
@@ -173,7 +173,7 @@ def to_image_url(request: Request, path: str | None) -> str | None:
 def list_my_groups(
     request: Request,
     db: Session = Depends(get_db),
-    user: User = Depends(current_user),
+    user: CachedUser = Depends(current_user),
 ):
     subq = (
         select(
@@ -241,103 +241,18 @@ def get_group_detail(group_id: int, db: Session = Depends(get_db)):
 def leave_group(
     group_id: int,
     db: Session = Depends(get_db),
-    user: User = Depends(current_user),
+    user: CachedUser = Depends(current_user),
 ):
-    # 0) 내가 이 그룹에 속해 있는지 확인
-    stmt = (
-        select(GroupMember)
-        .where(
-            GroupMember.group_id == group_id,
-            GroupMember.user_id == user.id,
-        )
-    )
-    gm = db.scalars(stmt).first()
-
-    if not gm:
-        raise HTTPException(status_code=404, detail="해당 그룹에 가입되어 있지 않습니다.")
-
-    # 🔹 이 그룹에 연결된 채팅방(있다면)
-    chat_room = db.scalars(
-        select(ChatRoom).where(ChatRoom.group_id == group_id)
-    ).first()
-
-    # ─────────────────────────────────────
-    # 🔹 유저를 채팅방에서 제거하는 헬퍼
-    # ─────────────────────────────────────
-    def remove_from_chat_room():
-        nonlocal chat_room
-        if not chat_room:
-            return
-        rm = db.scalars(
-            select(RoomMember).where(
-                RoomMember.room_id == chat_room.id,
-                RoomMember.user_id == user.id,
-            )
-        ).first()
-        if rm:
-            db.delete(rm)
-
-    # ─────────────────────────────────────
-    # 🔹 유저가 이 방에서 남긴 메시지 삭제
-    # ─────────────────────────────────────
-    def remove_user_messages():
-        nonlocal chat_room
-        if not chat_room:
-            return
-        # 이 방 + 이 유저가 쓴 모든 메시지 삭제
-        db.query(Message).filter(
-            Message.room_id == chat_room.id,
-            Message.user_id == user.id,
-        ).delete(synchronize_session=False)
-
-    # 1) 방장이 아닌 경우 → 그냥 탈퇴
-    if gm.role != GroupRole.OWNER:
-        remove_from_chat_room()
-        remove_user_messages()
-
-        db.delete(gm)
-        db.commit()
-        return  # 204 No Content
-
-    # 2) 방장인 경우 → 다른 멤버가 있는지 확인
-    next_owner_stmt = (
-        select(GroupMember)
-        .where(
-            GroupMember.group_id == group_id,
-            GroupMember.id != gm.id,
-        )
-        .order_by(GroupMember.id.asc())
-        .limit(1)
-    )
-    next_owner = db.scalars(next_owner_stmt).first()
-
-    if next_owner:
-        # 2-1) 다른 멤버가 있으면 → OWNER 위임 후 나는 탈퇴
-        next_owner.role = GroupRole.OWNER
-
-        remove_from_chat_room()
-        remove_user_messages()
-
-        db.delete(gm)
-        db.commit()
-        return
-
-    # 2-2) 다른 멤버가 없으면 → 그냥 탈퇴 + 그룹 해산
-    #    이 경우엔 어차피 Group 삭제 → ondelete="CASCADE"로 ChatRoom/Message 다 같이 삭제됨
-    remove_from_chat_room()
-    remove_user_messages()  # 사실 이 경우는 안 해도 되지만, 안전하게 넣어도 무방
-
-    db.delete(gm)
-
-    group = db.get(Group, group_id)
-    if group:
-        db.delete(group)
-
-        # (선택) 안전하게 ChatRoom도 직접 삭제
-        if chat_room:
-            db.delete(chat_room)
-
-    db.commit()
+    # 탈퇴/위임/해산은 서비스에서 bulk DELETE 로 처리 (행을 메모리에 올리지 않음)
+    room_id, dissolved = group_service.leave_group(db, group_id, user.id)
+
+    if room_id is not None:
+        # 내가 쓴 메시지가 지워졌으니 최근 메시지 캐시도 비움 (백플레인으로 모든 워커에)
+        ws_manager.signal(room_id, "history_invalidate")
+        if dissolved:
+            ws_manager.signal(room_id, "membership_invalidate")
+        else:
+            ws_manager.signal(room_id, "membership_remove", user_id=user.id)
     return  # 204 No Content
 
 
@@ -398,7 +313,7 @@ def build_group_detail(db: Session, group: Group) -> GroupDetailOut:
 def join_by_invite(
     body: InviteRedeemIn,
     db: Session = Depends(get_db),
-    user: User = Depends(current_user),
+    user: CachedUser = Depends(current_user),
 ):
 
     # 1) 초대 코드 사용(redeem) + 검증
@@ -452,6 +367,7 @@ def join_by_invite(
         db.add(member)
         db.commit()
         print("✅ commit 성공")
+        membership_index.add_group_member(group_id, user.id)
         db.refresh(group)
     else:
         print("ℹ️ 이미 그룹 멤버입니다.")
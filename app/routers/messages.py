@@ -1,41 +1,69 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.models.message import Message
-from app.models.user import User
+from app.deps.auth import current_user
+from app.utils.user_cache import CachedUser
 from app.schemas.message import MessageOut
+from app.services import message_service
+from app.websocket.membership import membership_index
 
 # ✅ api/v1까지 포함해서 prefix 지정
 router = APIRouter(prefix="/api/v1/messages", tags=["Messages"])
 
 
+@router.get("/search", response_model=list[MessageOut])
+def search_messages(
+    q: str = Query(..., min_length=1, max_length=100),
+    room_id: int | None = Query(None, ge=1),
+    limit: int = Query(30, ge=1, le=100),
+    before_id: int | None = Query(None, ge=1),
+    db: Session = Depends(get_db),
+    user: CachedUser = Depends(current_user),
+):
+    """
+    채팅 메시지 검색 (최신 → 오래된 순)
+    - room_id 지정 시 그 방만, 없으면 내가 속한 모든 방
+    - 공백으로 나눈 단어는 모두 포함(AND), 단어는 앞부분 일치 ("회의" → "회의록을")
+    - 다음 페이지: before_id=이전 결과의 마지막 id
+    PostgreSQL 은 tsvector GIN 인덱스, SQLite 는 FTS5 테이블로 검색
+    """
+    if room_id is not None and not membership_index.check(room_id, user.id):
+        raise HTTPException(status_code=403, detail="채팅방 멤버가 아닙니다.")
+
+    return message_service.search_messages(
+        db,
+        user.id,
+        q,
+        room_id=room_id,
+        limit=limit,
+        before_id=before_id,
+    )
+
+
 @router.get("/rooms/{room_id}", response_model=list[MessageOut])
 def get_messages(
     room_id: int,
+    limit: int = Query(100, ge=1, le=200),
+    before_id: int | None = Query(None, ge=1),
+    after_id: int | None = Query(None, ge=1),
     db: Session = Depends(get_db),
 ):
-    # Message + User join
-    stmt = (
-        select(Message, User.nickname)
-        .join(User, Message.user_id == User.id, isouter=True)
-        .where(Message.room_id == room_id)
-        .order_by(Message.created_at.asc())
-        .limit(100)
+    """
+    - 커서 없음   : 최신 limit 개 (채팅방 처음 열 때)
+    - before_id : 해당 메시지보다 이전 limit 개 (위로 스크롤)
+    - after_id  : 해당 메시지 이후 limit 개 (재접속 후 빠진 메시지 채우기)
+    응답은 항상 오래된 → 최신 순서.
+    (room_id, created_at, id) 인덱스 범위 스캔 한 번으로 끝나도록 keyset 방식 사용
+    최근 구간은 프로세스 메모리의 hot-tail 캐시에서 DB 없이 바로 응답
+    """
+    if before_id is not None and after_id is not None:
+        raise HTTPException(status_code=400, detail="before_id와 after_id는 함께 쓸 수 없습니다.")
+
+    return message_service.list_messages(
+        db,
+        room_id,
+        limit=limit,
+        before_id=before_id,
+        after_id=after_id,
     )
-    rows = db.execute(stmt).all()
-
-    result: list[MessageOut] = []
-    for msg, nickname in rows:
-        result.append(
-            MessageOut(
-                id=msg.id,
-                room_id=msg.room_id,
-                user_id=msg.user_id,
-                content=msg.content,
-                created_at=msg.created_at,
-                user_nickname=nickname,
-            )
-        )
-    return result
\ No newline at end of file
@@ -1,12 +1,12 @@
 # app/routers/post.py
 from typing import List
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.models.user import User
 from app.deps.auth import current_user
+from app.utils.user_cache import CachedUser
 from app.schemas.post import (
     PostCreate,
     PostSummaryOut,
@@ -26,15 +26,23 @@ def list_posts(
     group_id: int,
     from_: int = 0,
     to: int = 19,
+    before_id: int | None = Query(None, ge=1),
+    limit: int | None = Query(None, ge=1, le=100),
     db: Session = Depends(get_db),
-    user: User = Depends(current_user),
+    user: CachedUser = Depends(current_user),
 ):
+    """
+    - before_id/limit : 다음 페이지는 before_id=이전 결과의 마지막 id (첫 페이지는 limit 만)
+    - from_/to        : 예전 방식 (OFFSET), before_id/limit 없이 호출하면 그대로 동작
+    """
     return post_service.list_posts(
         db=db,
         user=user,
         group_id=group_id,
         from_=from_,
         to=to,
+        before_id=before_id,
+        limit=limit,
     )
 
 
@@ -44,7 +52,7 @@ def create_post(
     group_id: int,
     body: PostCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(current_user),
+    user: CachedUser = Depends(current_user),
 ):
     return post_service.create_post(
         db=db,
@@ -60,7 +68,7 @@ def get_post_detail(
     group_id: int,
     post_id: int,
     db: Session = Depends(get_db),
-    user: User = Depends(current_user),
+    user: CachedUser = Depends(current_user),
 ):
     return post_service.get_post_detail(
         db=db,
@@ -70,13 +78,47 @@ def get_post_detail(
     )
 
 
-# 좋아요 토글
+# 좋아요 (여러 번 보내도 한 번만 반영)
+@router.put("/{post_id}/likes", response_model=LikeOut)
+def like_post(
+    group_id: int,
+    post_id: int,
+    db: Session = Depends(get_db),
+    user: CachedUser = Depends(current_user),
+):
+    return post_service.set_like(
+        db=db,
+        user=user,
+        group_id=group_id,
+        post_id=post_id,
+        liked=True,
+    )
+
+
+# 좋아요 취소
+@router.delete("/{post_id}/likes", response_model=LikeOut)
+def unlike_post(
+    group_id: int,
+    post_id: int,
+    db: Session = Depends(get_db),
+    user: CachedUser = Depends(current_user),
+):
+    return post_service.set_like(
+        db=db,
+        user=user,
+        group_id=group_id,
+        post_id=post_id,
+        liked=False,
+    )
+
+
+# 좋아요 토글 (예전 클라이언트용)
 @router.post("/{post_id}/likes", response_model=LikeOut)
 def toggle_like(
     group_id: int,
     post_id: int,
     db: Session = Depends(get_db),
-    user: User = Depends(current_user),
+    user: CachedUser = Depends(current_user),
 ):
     return post_service.toggle_like(
         db=db,
@@ -97,7 +139,7 @@ def create_comment(
     post_id: int,
     body: CommentCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(current_user),
+    user: CachedUser = Depends(current_user),
 ):
     return post_service.create_comment(
         db=db,
@@ -113,14 +155,29 @@ def create_comment(
 def list_comments(
     group_id: int,
     post_id: int,
+    limit: int = Query(post_service.COMMENT_PAGE_SIZE, ge=1, le=200),
+    before_id: int | None = Query(None, ge=1),
+    after_id: int | None = Query(None, ge=1),
     db: Session = Depends(get_db),
-    user: User = Depends(current_user),
+    user: CachedUser = Depends(current_user),
 ):
+    """
+    - 커서 없음   : 최신 limit 개
+    - before_id : 해당 댓글보다 이전 limit 개 (상세에 실린 댓글 위로 더 보기)
+    - after_id  : 해당 댓글 이후 limit 개
+    응답은 항상 오래된 → 최신 순서.
+    """
+    if before_id is not None and after_id is not None:
+        raise HTTPException(status_code=400, detail="before_id와 after_id는 함께 쓸 수 없습니다.")
+
     return post_service.list_comments(
         db=db,
         user=user,
         group_id=group_id,
         post_id=post_id,
+        limit=limit,
+        before_id=before_id,
+        after_id=after_id,
     )
 
 
@@ -134,7 +191,7 @@ def delete_comment(
     post_id: int,
     comment_id: int,
     db: Session = Depends(get_db),
-    user: User = Depends(current_user),
+    user: CachedUser = Depends(current_user),
 ):
     post_service.delete_comment(
         db=db,
@@ -153,7 +210,7 @@ def delete_post(
     group_id: int,
     post_id: int,
     db: Session = Depends(get_db),
-    user: User = Depends(current_user),
+    user: CachedUser = Depends(current_user),
 ):
     post_service.delete_post(
         db=db,
@@ -1,14 +1,19 @@
 # app/routers/rooms.py
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session, joinedload
 
 from app.database import get_db
 from app.models.group import Group
 from app.models.group_member import GroupMember
+from app.models.message import Message
 from app.models.room import ChatRoom, RoomMember
-from app.models.user import User
 from app.deps.auth import current_user
-from app.schemas.room import RoomCreate, RoomOut
+from app.utils.user_cache import CachedUser
+from app.schemas.room import RoomCreate, RoomOut, RoomReadIn, RoomReadOut
+from app.websocket.membership import membership_index
 
 # ✅ api/v1까지 포함
 router = APIRouter(prefix="/api/v1/rooms", tags=["Rooms"])
@@ -38,21 +43,21 @@ def create_room(
 def join_room(
     room_id: int,
     db: Session = Depends(get_db),
-    user: User = Depends(current_user),
+    user: CachedUser = Depends(current_user),
 ):
     exists = db.query(ChatRoom).filter_by(id=room_id).first()
     if not exists:
         raise HTTPException(status_code=404, detail="방이 존재하지 않습니다.")
 
-    already = (
-        db.query(RoomMember)
-        .filter_by(room_id=room_id, user_id=user.id)
-        .first()
+    # 이미 들어와 있으면 그대로 (동시에 눌러도 uq_room_members_room_user 로 한 행만)
+    insert_fn = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    db.execute(
+        insert_fn(RoomMember)
+        .values(room_id=room_id, user_id=user.id)
+        .on_conflict_do_nothing(index_elements=["room_id", "user_id"])
     )
-
-    if not already:
-        db.add(RoomMember(room_id=room_id, user_id=user.id))
-        db.commit()
+    db.commit()
+    membership_index.add(room_id, user.id)
 
 
 # 그룹 전용 채팅방: group_id 기준으로 1개 자동 생성/조회
@@ -85,17 +90,79 @@ def get_or_create_group_room(
 @router.get("/my-group", response_model=list[RoomOut])
 def list_my_group_rooms(
     db: Session = Depends(get_db),
-    user: User = Depends(current_user),
+    user: CachedUser = Depends(current_user),
 ):
     """
     - GroupMember 기준으로 내가 속해 있는 그룹 찾고
     - 그 그룹들에 연결된 ChatRoom(group_id)만 가져옴
+    - 방별 안 읽은 메시지 수까지 쿼리 한 번으로 (방마다 따로 조회 X)
     """
-    rooms = (
-        db.query(ChatRoom)
-        .join(Group, Group.id == ChatRoom.group_id)
-        .join(GroupMember, GroupMember.group_id == Group.id)
-        .filter(GroupMember.user_id == user.id)
-        .all()
+    # 내 읽음 위치 (RoomMember 행이 없으면 0 → 남이 쓴 메시지 전부 안 읽음)
+    # (행이 없으면 서브쿼리가 NULL → coalesce 는 서브쿼리 바깥에서)
+    last_read = func.coalesce(
+        select(RoomMember.last_read_message_id)
+        .where(RoomMember.room_id == ChatRoom.id, RoomMember.user_id == user.id)
+        .scalar_subquery(),
+        0,
     )
-    return rooms
\ No newline at end of file
+    unread = (
+        select(func.count(Message.id))
+        .where(
+            Message.room_id == ChatRoom.id,
+            Message.id > last_read,
+            # 탈퇴한 유저의 메시지(user_id NULL)도 남이 쓴 메시지
+            or_(Message.user_id.is_(None), Message.user_id != user.id),
+        )
+        .scalar_subquery()
+    )
+
+    rows = db.execute(
+        select(ChatRoom, unread.label("unread_count"))
+        .join(GroupMember, GroupMember.group_id == ChatRoom.group_id)
+        .where(GroupMember.user_id == user.id)
+        .options(joinedload(ChatRoom.group))
+    ).all()
+
+    rooms = []
+    for room, unread_count in rows:
+        room.unread_count = unread_count
+        rooms.append(room)
+    return rooms
+
+
+# 읽음 위치 갱신 (채팅방을 보고 있을 때 마지막으로 본 메시지 id 로 호출)
+@router.post("/{room_id}/read", response_model=RoomReadOut)
+def mark_room_read(
+    room_id: int,
+    body: RoomReadIn,
+    db: Session = Depends(get_db),
+    user: CachedUser = Depends(current_user),
+):
+    if not membership_index.check(room_id, user.id):
+        raise HTTPException(status_code=403, detail="채팅방 멤버가 아닙니다.")
+
+    # 그룹 채팅방은 RoomMember 행 없이 GroupMember 만으로 입장하므로 처음 읽을 때 생성 →
+    # INSERT ... ON CONFLICT DO UPDATE 한 문장 (uq_room_members_room_user, 동시 요청에도 한 행)
+    # 읽음 위치는 앞으로만 이동 (늦게 도착한 예전 요청이 되돌리지 않도록)
+    insert_fn = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insert_fn(RoomMember).values(
+        room_id=room_id,
+        user_id=user.id,
+        last_read_message_id=body.last_read_message_id,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["room_id", "user_id"],
+        set_={
+            "last_read_message_id": case(
+                (
+                    func.coalesce(RoomMember.last_read_message_id, 0) < stmt.excluded.last_read_message_id,
+                    stmt.excluded.last_read_message_id,
+                ),
+                else_=RoomMember.last_read_message_id,
+            )
+        },
+    ).returning(RoomMember.last_read_message_id)
+    last_read_message_id = db.scalar(stmt)
+    db.commit()
+
+    return RoomReadOut(room_id=room_id, last_read_message_id=last_read_message_id)
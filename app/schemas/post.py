@@ -79,7 +79,8 @@ class PostDetailOut(BaseModel):
     created_at: datetime
     like_count: int
     is_liked: bool
-    comments: List[CommentOut] = []
+    comment_count: int = 0
+    comments: List[CommentOut] = []  # 최신 댓글 일부만 (나머지는 댓글 목록 API)
     image_urls: List[str] = []
 
     class Config:
@@ -1,6 +1,6 @@
 # app/schemas/room.py
 from datetime import datetime
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 class RoomBase(BaseModel):
     name: str
@@ -23,6 +23,16 @@ class RoomOut(RoomBase):
     
     last_message_content: str | None = None
     last_message_created_at: datetime | None = None
+    # 내가 안 읽은 메시지 수 (내 목록 조회 시에만 채워짐)
+    unread_count: int = 0
 
     class Config:
         model_config = ConfigDict(from_attributes=True)
+
+
+class RoomReadIn(BaseModel):
+    last_read_message_id: int = Field(..., ge=1)
+
+class RoomReadOut(BaseModel):
+    room_id: int
+    last_read_message_id: int | None = None
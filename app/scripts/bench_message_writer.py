@@ -0,0 +1,112 @@
+# app/scripts/bench_message_writer.py
+"""
+채팅 메시지 저장 벤치마크: 메시지마다 INSERT+COMMIT vs MessageWriter 그룹 커밋
+
+    python -m app.scripts.bench_message_writer --messages 5000 --senders 50
+    DATABASE_URL=postgresql://... python -m app.scripts.bench_message_writer --use-app-db
+
+기본은 임시 SQLite 파일에 테이블을 만들어서 측정한다.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, SessionLocal
+from app.models.user import User
+from app.models.room import ChatRoom
+from app.services.message_service import MessageWriter, create_message
+
+# ⚠️ mapper 설정 때문에 import 필요
+from app.models.group import Group  # noqa: F401
+from app.models.board_registry import BoardRegistry  # noqa: F401
+from app.models.post import Post  # noqa: F401
+
+
+def setup(session_factory) -> tuple[int, int]:
+    db = session_factory()
+    try:
+        user = User(email=f"bench-{time.time_ns()}@example.com", name="bench", nickname="bench", hashed_password="x")
+        room = ChatRoom(name="bench room")
+        db.add_all([user, room])
+        db.commit()
+        return room.id, user.id
+    finally:
+        db.close()
+
+
+async def run_per_message(session_factory, room_id: int, user_id: int, messages: int, senders: int) -> float:
+    """기존 방식: 메시지 1개 = 세션 1개 + INSERT + COMMIT + SELECT(refresh)"""
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(max_workers=4)
+
+    def save(i: int):
+        db = session_factory()
+        try:
+            create_message(db, room_id, user_id, f"message {i}")
+        finally:
+            db.close()
+
+    async def sender(n: int):
+        for i in range(n):
+            await loop.run_in_executor(pool, save, i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(sender(messages // senders) for _ in range(senders)))
+    elapsed = time.perf_counter() - started
+    pool.shutdown()
+    return elapsed
+
+
+async def run_batched(session_factory, room_id: int, user_id: int, messages: int, senders: int, window_ms: float) -> float:
+    writer = MessageWriter(session_factory=session_factory, window_ms=window_ms)
+    writer.start()
+
+    async def sender(n: int):
+        for i in range(n):
+            await writer.submit(room_id, user_id, f"message {i}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(sender(messages // senders) for _ in range(senders)))
+    elapsed = time.perf_counter() - started
+    await writer.stop()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--senders", type=int, default=50, help="동시에 보내는 소켓 수")
+    parser.add_argument("--window-ms", type=float, default=5)
+    parser.add_argument("--use-app-db", action="store_true", help="DATABASE_URL 의 DB 사용 (테이블 생성/데이터 추가됨)")
+    args = parser.parse_args()
+
+    if args.use_app_db:
+        session_factory = SessionLocal
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    room_id, user_id = setup(session_factory)
+    total = (args.messages // args.senders) * args.senders
+
+    t_single = asyncio.run(run_per_message(session_factory, room_id, user_id, total, args.senders))
+    t_batch = asyncio.run(run_batched(session_factory, room_id, user_id, total, args.senders, args.window_ms))
+
+    print(f"messages={total} senders={args.senders} window={args.window_ms}ms")
+    print(f"per-message commit : {total / t_single:10.1f} msg/s  ({t_single:.3f}s)")
+    print(f"group commit       : {total / t_batch:10.1f} msg/s  ({t_batch:.3f}s)")
+    print(f"speedup            : {t_single / t_batch:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
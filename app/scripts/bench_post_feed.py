@@ -0,0 +1,183 @@
+# app/scripts/bench_post_feed.py
+"""
+그룹 게시판 피드 벤치마크: 페이지(게시글 20개) 하나 조회 시간 vs 인기글의 좋아요/댓글 수
+
+    python -m app.scripts.bench_post_feed --posts 200 --levels 0,1000,5000,20000
+    DATABASE_URL=postgresql://... python -m app.scripts.bench_post_feed --use-app-db
+
+첫 페이지에 인기글이 하나 있고, 그 글의 좋아요/댓글 수를 levels 만큼 늘려가며 측정한다.
+- joinedload : 예전 방식 (likes, comments 를 전부 joinedload 해서 len()/any())
+- list_posts : 현재 post_service.list_posts
+
+기본은 임시 SQLite 파일에 테이블을 만들어서 측정한다.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, insert, select, update
+from sqlalchemy.orm import joinedload, sessionmaker
+
+from app.database import Base, SessionLocal
+from app.models.group import Group
+from app.models.post import Post, PostComment, PostLike
+from app.models.user import User
+from app.services.post_service import list_posts
+from app.utils.user_cache import CachedUser
+
+# ⚠️ mapper 설정 때문에 import 필요
+from app.models.board_registry import BoardRegistry  # noqa: F401
+from app.models.room import ChatRoom  # noqa: F401
+from app.models.message import Message  # noqa: F401
+
+PAGE_SIZE = 20
+
+
+def setup(session_factory, posts: int, max_users: int) -> tuple[int, int, int, list[int]]:
+    """그룹 1개 + 게시글 posts 개 + 좋아요/댓글 달 유저 max_users 명"""
+    db = session_factory()
+    try:
+        tag = time.time_ns()
+        db.execute(
+            insert(User),
+            [
+                {"email": f"bench-{tag}-{i}@example.com", "name": f"u{i}", "nickname": f"u{i}", "hashed_password": "x"}
+                for i in range(max_users)
+            ],
+        )
+        user_ids = list(db.scalars(select(User.id).where(User.email.like(f"bench-{tag}-%")).order_by(User.id)))
+        group = Group(name=f"bench-{tag}", creator_id=user_ids[0])
+        db.add(group)
+        db.flush()
+
+        # 최신 글이 첫 페이지 → 인기글은 가장 마지막에 만든 글
+        now = datetime.now(timezone.utc)
+        db.execute(
+            insert(Post),
+            [
+                {
+                    "group_id": group.id,
+                    "author_id": user_ids[i % len(user_ids)],
+                    "title": f"post {i}",
+                    "content": "본문 " * 20,
+                    "image_urls": [],
+                    "created_at": now - timedelta(seconds=posts - i),
+                }
+                for i in range(posts)
+            ],
+        )
+        viral_id = db.scalar(
+            select(Post.id).where(Post.group_id == group.id).order_by(Post.created_at.desc()).limit(1)
+        )
+        db.commit()
+        return group.id, viral_id, user_ids[0], user_ids
+    finally:
+        db.close()
+
+
+def grow(session_factory, post_id: int, user_ids: list[int], likes: int, comments: int) -> None:
+    """인기글의 좋아요/댓글 수를 목표치까지 채움"""
+    db = session_factory()
+    try:
+        have_likes = db.query(PostLike).filter(PostLike.post_id == post_id).count()
+        have_comments = db.query(PostComment).filter(PostComment.post_id == post_id).count()
+        if likes > have_likes:
+            db.execute(
+                insert(PostLike),
+                [{"post_id": post_id, "user_id": uid} for uid in user_ids[have_likes:likes]],
+            )
+        if comments > have_comments:
+            db.execute(
+                insert(PostComment),
+                [
+                    {"post_id": post_id, "author_id": user_ids[i % len(user_ids)], "content": f"댓글 {i}"}
+                    for i in range(have_comments, comments)
+                ],
+            )
+        db.execute(
+            update(Post)
+            .where(Post.id == post_id)
+            .values(like_count=max(likes, have_likes), comment_count=max(comments, have_comments))
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def legacy_list_posts(db, user_id: int, group_id: int) -> list[tuple]:
+    posts = (
+        db.query(Post)
+        .options(joinedload(Post.author), joinedload(Post.likes), joinedload(Post.comments))
+        .filter(Post.group_id == group_id)
+        .order_by(Post.created_at.desc())
+        .offset(0)
+        .limit(PAGE_SIZE)
+        .all()
+    )
+    return [(p.id, len(p.likes), len(p.comments), any(l.user_id == user_id for l in p.likes)) for p in posts]
+
+
+def measure(session_factory, fn, repeat: int) -> float:
+    """한 페이지 조회 ms (중앙값). 매번 새 세션 → identity map 재사용 없음"""
+    samples = []
+    for _ in range(repeat):
+        db = session_factory()
+        try:
+            started = time.perf_counter()
+            fn(db)
+            samples.append((time.perf_counter() - started) * 1000)
+        finally:
+            db.close()
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=200)
+    parser.add_argument("--levels", default="0,1000,5000,20000", help="인기글 좋아요 수 (댓글도 같은 수)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-legacy-over", type=int, default=5000, help="이보다 크면 joinedload 측정 생략 (좋아요×댓글 행)")
+    parser.add_argument("--use-app-db", action="store_true", help="DATABASE_URL 의 DB 사용 (테이블 생성/데이터 추가됨)")
+    args = parser.parse_args()
+
+    levels = [int(x) for x in args.levels.split(",") if x.strip()]
+
+    if args.use_app_db:
+        session_factory = SessionLocal
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    group_id, viral_id, user_id, user_ids = setup(session_factory, args.posts, max(levels + [1]))
+    # current_user 가 넘겨주는 것과 같은 스냅샷
+    db = session_factory()
+    try:
+        viewer = CachedUser.from_user(db.get(User, user_id))
+    finally:
+        db.close()
+
+    print(f"posts={args.posts} page={PAGE_SIZE} repeat={args.repeat}")
+    print(f"{'likes=comments':>15} {'joinedload':>12} {'list_posts':>12}")
+    for n in levels:
+        grow(session_factory, viral_id, user_ids, n, n)
+        if n <= args.skip_legacy_over:
+            legacy = f"{measure(session_factory, lambda db: legacy_list_posts(db, user_id, group_id), args.repeat):9.1f} ms"
+        else:
+            legacy = "skipped"
+        current = measure(
+            session_factory,
+            lambda db: list_posts(db, viewer, group_id, 0, PAGE_SIZE - 1),
+            args.repeat,
+        )
+        print(f"{n:>15} {legacy:>12} {current:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
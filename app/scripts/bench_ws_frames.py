@@ -0,0 +1,104 @@
+# app/scripts/bench_ws_frames.py
+"""
+WebSocket 프레임 형식 벤치마크: 메시지당 바이트 수 / 인코딩 CPU
+
+    python -m app.scripts.bench_ws_frames --messages 20000
+
+비교 대상
+- json (표준 라이브러리 / orjson 설치 시 orjson)
+- msgpack (설치 시)
+- json + permessage-deflate 흉내 (zlib raw deflate + SYNC_FLUSH, RFC 7692)
+    · context takeover O : 소켓마다 압축 사전 유지 → 작지만 소켓마다 따로 압축 (브로드캐스트 1회 = 방 인원수만큼 압축)
+    · context takeover X : 메시지마다 새로 압축 → 짧은 채팅 메시지는 거의 안 줄어듦
+  window bits 별 소켓당 압축 메모리도 같이 출력 (zlib: 2^(wbits+2) + 2^(memLevel+9))
+
+json / msgpack 은 broadcast 당 한 번만 인코딩하므로 방 크기와 상관없이 비용이 같다.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+
+from app.websocket import codec
+
+_SAMPLES = [
+    "ㅋㅋㅋㅋ",
+    "오늘 몇 시에 만나?",
+    "저녁 7시에 강남역 11번 출구 앞에서 보자! 늦으면 먼저 들어가 있을게",
+    "회의록 공유합니다. 다음 주까지 각자 맡은 부분 정리해서 올려주세요. 질문 있으면 여기 남겨주시고요 🙏",
+    "ok",
+    "사진 올렸어요",
+]
+
+
+def make_messages(n: int) -> list[dict]:
+    rnd = random.Random(42)
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": 1_000_000 + i,
+            "room_id": 42,
+            "user_id": rnd.randint(1, 50),
+            "nickname": rnd.choice(["민지", "haru", "지훈이", "moyo_bot", "서연"]),
+            "content": rnd.choice(_SAMPLES),
+            "created_at": (now + timedelta(milliseconds=i * 350)).isoformat(),
+        }
+        for i in range(n)
+    ]
+
+
+def bench_encode(name: str, fn, messages: list[dict]) -> None:
+    start = time.perf_counter()
+    frames = [fn(m) for m in messages]
+    elapsed = time.perf_counter() - start
+    size = sum(len(f.encode("utf-8") if isinstance(f, str) else f) for f in frames)
+    print(f"{name:<34} {size / len(messages):8.1f} B/msg {elapsed / len(messages) * 1e6:8.2f} µs/msg")
+
+
+def bench_deflate(messages: list[dict], wbits: int, mem_level: int, takeover: bool) -> None:
+    texts = [codec.dumps(m).encode("utf-8") for m in messages]
+    comp = zlib.compressobj(6, zlib.DEFLATED, -wbits, mem_level)
+    size = 0
+    start = time.perf_counter()
+    for t in texts:
+        if not takeover:
+            comp = zlib.compressobj(6, zlib.DEFLATED, -wbits, mem_level)
+        out = comp.compress(t) + comp.flush(zlib.Z_SYNC_FLUSH)
+        size += len(out) - 4  # 끝의 00 00 ff ff 는 전송 안 함 (RFC 7692)
+    elapsed = time.perf_counter() - start
+    mem_kb = ((1 << (wbits + 2)) + (1 << (mem_level + 9))) / 1024
+    label = f"json+deflate w={wbits} mem={mem_level} {'ctx' if takeover else 'noctx'}"
+    print(
+        f"{label:<34} {size / len(messages):8.1f} B/msg {elapsed / len(messages) * 1e6:8.2f} µs/msg/socket"
+        f"  ~{mem_kb:.0f} KiB/socket"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=20000)
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages)
+    print(f"messages={args.messages}\n")
+
+    bench_encode("json (stdlib)", lambda m: json.dumps(m, ensure_ascii=False, separators=(",", ":")), messages)
+    if codec.orjson is not None:
+        bench_encode("json (orjson)", codec.dumps, messages)
+    if codec.msgpack is not None:
+        bench_encode("msgpack", lambda m: codec.encode(m, "msgpack"), messages)
+    else:
+        print("msgpack                            (pip install msgpack 후 다시 실행)")
+
+    print()
+    for wbits, mem_level in ((15, 8), (12, 5), (10, 4), (9, 1)):
+        bench_deflate(messages, wbits, mem_level, takeover=True)
+    bench_deflate(messages, 15, 8, takeover=False)
+
+
+if __name__ == "__main__":
+    main()
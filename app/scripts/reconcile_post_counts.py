@@ -0,0 +1,89 @@
+# app/scripts/reconcile_post_counts.py
+"""
+posts.like_count / comment_count 를 실제 post_likes / post_comments 개수로 다시 맞춤.
+
+    python -m app.scripts.reconcile_post_counts            # 어긋난 글만 고침
+    python -m app.scripts.reconcile_post_counts --dry-run  # 고치지 않고 목록만 출력
+
+평소에는 post_service 가 좋아요/댓글과 같은 트랜잭션에서 개수를 +/- 하므로 어긋날 일이 없지만,
+DB 를 직접 고쳤거나 예전 코드로 지운 데이터가 있으면 여기서 정리한다.
+id 구간(--batch) 단위로 나눠서 처리 → 큰 테이블도 한 트랜잭션이 오래 잡히지 않음.
+"""
+from __future__ import annotations
+
+import argparse
+
+from sqlalchemy import func, or_, select, update
+
+from app.database import SessionLocal
+from app.models.post import Post, PostComment, PostLike
+
+# ⚠️ mapper 설정 때문에 import 필요
+from app.models.user import User  # noqa: F401
+from app.models.group import Group  # noqa: F401
+from app.models.board_registry import BoardRegistry  # noqa: F401
+from app.models.room import ChatRoom  # noqa: F401
+from app.models.message import Message  # noqa: F401
+
+_actual_likes = (
+    select(func.count(PostLike.id))
+    .where(PostLike.post_id == Post.id)
+    .correlate(Post)
+    .scalar_subquery()
+)
+_actual_comments = (
+    select(func.count(PostComment.id))
+    .where(PostComment.post_id == Post.id)
+    .correlate(Post)
+    .scalar_subquery()
+)
+_drifted = or_(Post.like_count != _actual_likes, Post.comment_count != _actual_comments)
+
+
+def reconcile(batch: int = 1000, dry_run: bool = False) -> int:
+    db = SessionLocal()
+    fixed = 0
+    try:
+        max_id = db.scalar(select(func.max(Post.id))) or 0
+        for start in range(0, max_id + 1, batch):
+            in_range = Post.id.between(start, start + batch - 1)
+            rows = db.execute(
+                select(Post.id, Post.like_count, _actual_likes, Post.comment_count, _actual_comments)
+                .where(in_range, _drifted)
+                .order_by(Post.id)
+            ).all()
+            if not rows:
+                continue
+
+            for post_id, likes, real_likes, comments, real_comments in rows:
+                print(f"post {post_id}: like_count {likes} -> {real_likes}, comment_count {comments} -> {real_comments}")
+            fixed += len(rows)
+
+            if not dry_run:
+                db.execute(
+                    update(Post)
+                    .where(in_range, _drifted)
+                    .values(like_count=_actual_likes, comment_count=_actual_comments, updated_at=Post.updated_at)
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+    finally:
+        db.close()
+    return fixed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch", type=int, default=1000, help="한 번에 처리할 post id 구간 크기")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    fixed = reconcile(batch=args.batch, dry_run=args.dry_run)
+    if args.dry_run:
+        print(f"어긋난 게시글 {fixed}개 (dry-run, 변경 없음)")
+    else:
+        print(f"게시글 {fixed}개 개수 정리 완료")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,8 @@ from fastapi import HTTPException
 from datetime import datetime, timedelta
 from sqlalchemy import select
 from app.models.email_verification import EmailVerification
-from app.utils.security import gen_code, hash_code, verify_code, send_email_code
+from app.utils.security import gen_code, hash_code, verify_code
+from app.services.job_queue import job_queue
 
 def create_user(db: Session, data: UserCreate) -> User:
     email = data.email.lower().strip()
@@ -54,7 +55,7 @@ def request_email_code(db: Session, email: str) -> None:
         ev = EmailVerification(email=email, code_hash=code_h, expires_at=expires, last_sent_at=now, attempts=0)
         db.add(ev)
     db.commit()
-    send_email_code(email, code)  # 커밋 후 발송
+    job_queue.enqueue("send_email_code", to_email=email, code=code)  # 커밋 후 백그라운드 발송
 
 # 이메일 코드 확인
 def confirm_email_code(db: Session, email: str, code: str) -> None:
@@ -1,10 +1,12 @@
 import os
+import time
 import httpx
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import select, func
 from app.models.group import Group
 from app.models.board_registry import BoardRegistry
+from app.services.job_queue import job_handler, job_queue
 #from app.core.config import settings
 
 
@@ -76,4 +78,32 @@ async def url_exists(url: str) -> bool:
                 return True
             return False
     except httpx.RequestError:
-        return False
\ No newline at end of file
+        return False
+
+
+# ─────────────────────────────────────
+# url_exists 결과 캐시 (stale-while-revalidate)
+# - 처음 보는 URL 만 요청 안에서 확인
+# - BOARD_PROBE_TTL 이 지난 결과는 일단 그대로 응답하고 백그라운드 작업으로 갱신
+# ─────────────────────────────────────
+BOARD_PROBE_TTL = float(os.getenv("BOARD_PROBE_TTL", "300"))
+_probe_results: dict[str, tuple[float, bool]] = {}
+
+
+async def url_exists_cached(url: str) -> bool:
+    hit = _probe_results.get(url)
+    now = time.monotonic()
+    if hit is None:
+        ok = await url_exists(url)
+        _probe_results[url] = (now, ok)
+        return ok
+    checked_at, ok = hit
+    if now - checked_at > BOARD_PROBE_TTL:
+        _probe_results[url] = (now, ok)  # 갱신 중복 방지
+        job_queue.enqueue("board_probe", url=url)
+    return ok
+
+
+@job_handler("board_probe", persist=False)
+async def refresh_probe(url: str) -> None:
+    _probe_results[url] = (time.monotonic(), await url_exists(url))
@@ -2,13 +2,21 @@
 from sqlalchemy.orm import Session, selectinload, joinedload
 from fastapi import HTTPException, status
 from datetime import datetime
-from sqlalchemy import select, func
+from sqlalchemy import select, func, delete, update
 
 from app.models.group import Group, IdentityMode
 from app.schemas.group import GroupCreate
 from app.models.group_member import GroupMember, GroupRole
+from app.models.board_registry import BoardRegistry
+from app.models.calendar import UserEvent
+from app.models.friend_request import FriendRequest
+from app.models.message import Message
+from app.models.post import Post, PostComment, PostLike
+from app.models.room import ChatRoom, RoomMember
 from app.schemas.group import GroupDetailOut, GroupInfoOut, GroupMemberOut
+from app.database import SessionLocal
 from app.services import board_service
+from app.services.job_queue import job_handler, job_queue
 
 
 # [추가]
@@ -118,4 +126,114 @@ def get_group_with_relations(db, group_id: int) -> Group | None:
         .where(Group.id == group_id)
         .options(selectinload(Group.board_registry))
     )
-    return db.scalar(stmt)
\ No newline at end of file
+    return db.scalar(stmt)
+
+# ─────────────────────────────────────
+# 그룹 탈퇴 / 해산 (set 기반 일괄 삭제)
+# ORM cascade 는 posts/likes/comments/messages 를 전부 메모리에 올린 뒤 한 줄씩 지우므로
+# 큰 그룹일수록 느려짐 → 의존 순서대로 bulk DELETE 몇 번으로 끝냄 (행을 읽어오지 않음)
+# ─────────────────────────────────────
+def leave_group(db: Session, group_id: int, user_id: int) -> tuple[int | None, bool]:
+    """
+    그룹 탈퇴. 방장이 나가면 가장 먼저 가입한 멤버에게 위임, 남은 멤버가 없으면 그룹 해산.
+    커밋까지 하고 (그룹 채팅방 id, 해산 여부) 반환 → 라우터에서 캐시 정리용
+    """
+    role = db.scalar(
+        select(GroupMember.role).where(
+            GroupMember.group_id == group_id,
+            GroupMember.user_id == user_id,
+        )
+    )
+    if role is None:
+        raise HTTPException(status_code=404, detail="해당 그룹에 가입되어 있지 않습니다.")
+
+    room_id = db.scalar(select(ChatRoom.id).where(ChatRoom.group_id == group_id))
+
+    if role == GroupRole.OWNER:
+        next_owner_id = db.scalar(
+            select(GroupMember.id)
+            .where(
+                GroupMember.group_id == group_id,
+                GroupMember.user_id != user_id,
+            )
+            .order_by(GroupMember.id.asc())
+            .limit(1)
+        )
+        if next_owner_id is None:
+            db.execute(delete(GroupMember).where(GroupMember.group_id == group_id, GroupMember.user_id == user_id))
+            if not job_queue.persist:
+                # 작업이 DB 에 안 남는 설정 → 응답 후 재시작되면 멤버 없는 그룹이 남으므로 그 자리에서 해산
+                dissolve_group(db, group_id)
+                db.commit()
+                return room_id, True
+            # 혼자 남은 방장 → 멤버십 삭제와 해산 작업 기록을 한 트랜잭션으로 커밋하고 응답,
+            # 그룹 데이터 삭제는 백그라운드에서 (커밋 직후 죽어도 다른 워커/재기동 때 회수)
+            job = job_queue.stage(db, "dissolve_group", group_id=group_id)
+            db.commit()
+            job_queue.dispatch(job)
+            return room_id, True
+        db.execute(
+            update(GroupMember)
+            .where(GroupMember.id == next_owner_id)
+            .values(role=GroupRole.OWNER)
+        )
+
+    if room_id is not None:
+        # 채팅방 멤버십 + 이 유저가 이 방에 남긴 메시지
+        db.execute(delete(RoomMember).where(RoomMember.room_id == room_id, RoomMember.user_id == user_id))
+        db.execute(delete(Message).where(Message.room_id == room_id, Message.user_id == user_id))
+
+    db.execute(delete(GroupMember).where(GroupMember.group_id == group_id, GroupMember.user_id == user_id))
+    db.commit()
+    return room_id, False
+
+
+@job_handler("dissolve_group")
+def dissolve_group_job(group_id: int) -> None:
+    """멤버가 없는 그룹 해산 (그 사이 초대 링크로 누가 들어왔으면 새 멤버에게 방장 위임)"""
+    db = SessionLocal()
+    try:
+        first_member_id = db.scalar(
+            select(GroupMember.id)
+            .where(GroupMember.group_id == group_id)
+            .order_by(GroupMember.id.asc())
+            .limit(1)
+        )
+        if first_member_id is not None:
+            db.execute(
+                update(GroupMember)
+                .where(GroupMember.id == first_member_id)
+                .values(role=GroupRole.OWNER)
+            )
+        else:
+            dissolve_group(db, group_id)
+        db.commit()
+    finally:
+        db.close()
+
+
+def dissolve_group(db: Session, group_id: int) -> None:
+    """
+    그룹과 딸린 데이터를 자식 → 부모 순서로 일괄 삭제 (커밋은 호출하는 쪽에서).
+    DB FK 의 ON DELETE 설정(SQLite 는 기본 꺼짐)에 기대지 않고 직접 지운다.
+    """
+    post_ids = select(Post.id).where(Post.group_id == group_id)
+    room_ids = select(ChatRoom.id).where(ChatRoom.group_id == group_id)
+
+    # 게시판
+    db.execute(delete(PostLike).where(PostLike.post_id.in_(post_ids)))
+    db.execute(delete(PostComment).where(PostComment.post_id.in_(post_ids)))
+    db.execute(delete(Post).where(Post.group_id == group_id))
+
+    # 채팅
+    db.execute(delete(Message).where(Message.room_id.in_(room_ids)))
+    db.execute(delete(RoomMember).where(RoomMember.room_id.in_(room_ids)))
+    db.execute(delete(ChatRoom).where(ChatRoom.group_id == group_id))
+
+    # 그룹 일정 / 친구 요청(그룹 정보만 지움, FK 가 SET NULL) / 게시판 매핑 / 멤버
+    db.execute(delete(UserEvent).where(UserEvent.group_id == group_id))
+    db.execute(update(FriendRequest).where(FriendRequest.group_id == group_id).values(group_id=None))
+    db.execute(delete(BoardRegistry).where(BoardRegistry.group_id == group_id))
+    db.execute(delete(GroupMember).where(GroupMember.group_id == group_id))
+
+    db.execute(delete(Group).where(Group.id == group_id))
@@ -0,0 +1,332 @@
+# app/services/job_queue.py
+"""
+프로세스 내 백그라운드 작업 큐.
+
+요청 핸들러는 enqueue() 만 하고 바로 응답 → 메일 발송, 파일 삭제, 그룹 해산 같은 무거운 뒷처리는
+워커들이 처리한다. 실패하면 JOB_RETRY_BASE ** 시도횟수 초 뒤에 다시 (최대 JOB_MAX_ATTEMPTS 회).
+
+- 작업 등록: @job_handler("이름") 을 함수에 붙이면 됨 (동기 함수는 전용 스레드풀, async 는 이벤트 루프에서 실행)
+- 인자는 JSON 으로 저장 가능한 값만 (kwargs)
+- JOB_PERSIST=1 이면 background_jobs 테이블에 기록 → 재시작/크래시 후에도 남은 작업을 다시 실행
+  (persist=False 인 작업 — 예: 인증코드 메일 — 은 평문 인자를 DB 에 남기지 않음)
+  · 각 워커는 JOB_RECLAIM_INTERVAL 마다 자기가 들고 있는 작업 행의 updated_at 을 갱신(lease)하고,
+    JOB_RECLAIM_AFTER 넘게 갱신이 없는 행(죽은 워커의 작업)을 가져와서 실행
+  · 요청의 DB 변경과 작업 기록을 한 트랜잭션으로 묶으려면 stage(db, ...) → commit → dispatch(job)
+- 큐가 안 떠 있으면(스크립트 등) enqueue 한 자리에서 바로 실행
+"""
+import asyncio
+import functools
+import inspect
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.job import BackgroundJob
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BASE = float(os.getenv("JOB_RETRY_BASE", "2"))
+JOB_PERSIST = os.getenv("JOB_PERSIST", "0").strip().lower() in ("1", "true", "yes")
+# running 인 채로 이 시간(초) 넘게 갱신이 없으면 죽은 워커의 작업으로 보고 다시 가져감
+JOB_RECLAIM_AFTER = float(os.getenv("JOB_RECLAIM_AFTER", "300"))
+# lease 갱신 + 죽은 워커 작업 회수 주기(초). RECLAIM_AFTER 보다 충분히 짧아야 살아있는 워커 작업을 안 뺏음
+JOB_RECLAIM_INTERVAL = float(os.getenv("JOB_RECLAIM_INTERVAL", str(JOB_RECLAIM_AFTER / 3)))
+
+# 이름 -> (함수, DB 기록 여부)
+_handlers: dict[str, tuple[Callable, bool]] = {}
+
+
+def job_handler(name: str, persist: bool = True):
+    def decorator(fn: Callable) -> Callable:
+        _handlers[name] = (fn, persist)
+        return fn
+    return decorator
+
+
+@dataclass
+class _Job:
+    name: str
+    kwargs: dict
+    attempts: int = 0
+    row_id: int | None = None
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobQueue:
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        persist: bool = JOB_PERSIST,
+    ):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.persist = persist
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._executor: ThreadPoolExecutor | None = None
+        # 이 프로세스가 맡고 있는 (큐 대기/실행/재시도 대기) 작업 행 id → 주기적으로 lease 갱신
+        self._held: set[int] = set()
+        self.counters = {"enqueued": 0, "done": 0, "retried": 0, "failed": 0, "reclaimed": 0}
+
+    # ── 수명주기 ─────────────────────────────────────────
+    async def start(self):
+        if self._loop is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        if self.persist:
+            await self._reclaim()
+            self._tasks.append(asyncio.create_task(self._reclaimer()))
+
+    async def stop(self, timeout: float = 10):
+        """큐에 있는 작업을 timeout 까지 처리하고 종료 (DB 에 기록된 나머지는 다음 기동 때)"""
+        if self._loop is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"[JOB] stop: {self._queue.qsize()} job(s) left in queue")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._executor.shutdown(wait=False)
+        self._loop = None
+        self._queue = None
+        self._tasks = []
+        self._executor = None
+        self._held.clear()
+
+    # ── 등록 ─────────────────────────────────────────────
+    def enqueue(self, name: str, **kwargs) -> None:
+        """
+        어느 스레드에서든 호출 가능 (동기 라우터 → 스레드풀 포함).
+        DB 기록은 호출한 스레드에서 하므로, persist 작업은 동기 코드에서 넣는 것을 권장.
+        """
+        if name not in _handlers:
+            raise KeyError(f"unknown job: {name}")
+        item = _Job(name, kwargs)
+        loop = self._loop
+        if loop is not None and not loop.is_closed() and self.persist and _handlers[name][1]:
+            item.row_id = self._insert_row(item)
+        self.dispatch(item)
+
+    def stage(self, db: Session, name: str, **kwargs) -> _Job:
+        """
+        작업 행을 호출한 쪽 세션(트랜잭션)에 같이 기록 (persist 일 때만, 커밋은 호출한 쪽에서).
+        커밋 후 dispatch(job) 로 큐에 넣는다. 그 사이 프로세스가 죽어도 행이 남아 있어서 회수됨.
+        """
+        if name not in _handlers:
+            raise KeyError(f"unknown job: {name}")
+        item = _Job(name, kwargs)
+        if self.persist and _handlers[name][1]:
+            row = BackgroundJob(name=name, payload=json.dumps(kwargs), status="pending", attempts=0)
+            db.add(row)
+            db.flush()
+            item.row_id = row.id
+        return item
+
+    def dispatch(self, item: _Job) -> None:
+        """enqueue/stage 로 만든 작업을 큐에 넣음 (큐가 안 떠 있으면 바로 실행)"""
+        self.counters["enqueued"] += 1
+
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            self._run_inline(item)
+            return
+
+        if item.row_id is not None:
+            self._held.add(item.row_id)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._queue.put_nowait(item)
+        else:
+            loop.call_soon_threadsafe(self._queue.put_nowait, item)
+
+    def stats(self) -> dict:
+        return {"queued": self._queue.qsize() if self._queue else 0, **self.counters}
+
+    # ── 실행 ─────────────────────────────────────────────
+    async def _worker(self):
+        while True:
+            item = await self._queue.get()
+            try:
+                await self._execute(item)
+            except Exception as e:  # 워커는 죽지 않게
+                print(f"[JOB] worker error: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, item: _Job):
+        fn, _ = _handlers[item.name]
+        item.attempts += 1
+        if item.row_id is not None:
+            await self._in_executor(self._mark_row, item.row_id, "running", item.attempts, None)
+
+        try:
+            if inspect.iscoroutinefunction(fn):
+                await fn(**item.kwargs)
+            else:
+                await self._in_executor(functools.partial(fn, **item.kwargs))
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if item.attempts < self.max_attempts:
+                delay = JOB_RETRY_BASE ** item.attempts
+                print(f"[JOB] {item.name} failed (attempt {item.attempts}), retry in {delay:g}s: {error}")
+                self.counters["retried"] += 1
+                if item.row_id is not None:
+                    await self._in_executor(self._mark_row, item.row_id, "pending", item.attempts, error)
+                self._loop.call_later(delay, self._queue.put_nowait, item)
+            else:
+                print(f"[JOB] {item.name} gave up after {item.attempts} attempts: {error}")
+                self.counters["failed"] += 1
+                if item.row_id is not None:
+                    self._held.discard(item.row_id)
+                    await self._in_executor(self._mark_row, item.row_id, "failed", item.attempts, error)
+            return
+
+        self.counters["done"] += 1
+        if item.row_id is not None:
+            self._held.discard(item.row_id)
+            await self._in_executor(self._delete_row, item.row_id)
+
+    def _in_executor(self, fn, *args):
+        return self._loop.run_in_executor(self._executor, fn, *args)
+
+    def _run_inline(self, item: _Job):
+        fn, _ = _handlers[item.name]
+        try:
+            if inspect.iscoroutinefunction(fn):
+                try:
+                    asyncio.get_running_loop().create_task(fn(**item.kwargs))
+                except RuntimeError:
+                    asyncio.run(fn(**item.kwargs))
+            else:
+                fn(**item.kwargs)
+        except Exception as e:
+            # stage 로 기록된 행은 남겨 둠 → 다음에 뜨는 큐가 회수
+            print(f"[JOB] {item.name} failed (inline): {e}")
+            return
+        if item.row_id is not None:
+            self._delete_row(item.row_id)
+
+    # ── 회수 ─────────────────────────────────────────────
+    async def _reclaimer(self):
+        while True:
+            await asyncio.sleep(JOB_RECLAIM_INTERVAL)
+            try:
+                await self._reclaim()
+            except Exception as e:
+                print(f"[JOB] reclaim error: {e}")
+
+    async def _reclaim(self):
+        """내 작업 lease 갱신 → 갱신이 끊긴(죽은 워커의) 작업 가져오기"""
+        held = list(self._held)
+        if held:
+            await self._in_executor(self._touch_rows, held)
+        pending = await self._in_executor(self._claim_pending, set(held))
+        for item in pending:
+            self._held.add(item.row_id)
+            self._queue.put_nowait(item)
+        if pending:
+            self.counters["reclaimed"] += len(pending)
+            print(f"[JOB] resumed {len(pending)} pending job(s)")
+
+    # ── 영속화 ───────────────────────────────────────────
+    def _insert_row(self, item: _Job) -> int:
+        db = SessionLocal()
+        try:
+            row = BackgroundJob(name=item.name, payload=json.dumps(item.kwargs), status="pending", attempts=0)
+            db.add(row)
+            db.commit()
+            return row.id
+        finally:
+            db.close()
+
+    def _mark_row(self, row_id: int, status: str, attempts: int, error: str | None):
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.id == row_id)
+                .values(status=status, attempts=attempts, last_error=error, updated_at=_now())
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _delete_row(self, row_id: int):
+        db = SessionLocal()
+        try:
+            db.execute(delete(BackgroundJob).where(BackgroundJob.id == row_id))
+            db.commit()
+        finally:
+            db.close()
+
+    def _touch_rows(self, row_ids: list[int]):
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.id.in_(row_ids), BackgroundJob.status.in_(("pending", "running")))
+                .values(updated_at=_now())
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _claim_pending(self, held: set[int] = frozenset()) -> list[_Job]:
+        """
+        죽은 워커(재시작 전 포함)가 못 끝낸 작업 가져오기.
+        살아있는 워커는 JOB_RECLAIM_INTERVAL 마다 자기 작업의 updated_at 을 갱신하므로
+        JOB_RECLAIM_AFTER 넘게 갱신이 없는 것만, 조건부 UPDATE 로 하나씩 선점한다.
+        """
+        cutoff = _now() - timedelta(seconds=JOB_RECLAIM_AFTER)
+        db = SessionLocal()
+        claimed: list[_Job] = []
+        try:
+            rows = db.execute(
+                select(BackgroundJob.id, BackgroundJob.name, BackgroundJob.payload, BackgroundJob.attempts)
+                .where(
+                    BackgroundJob.status.in_(("pending", "running")),
+                    BackgroundJob.updated_at < cutoff,
+                )
+                .order_by(BackgroundJob.id.asc())
+            ).all()
+            for row_id, name, payload, attempts in rows:
+                if name not in _handlers or row_id in held:
+                    continue
+                result = db.execute(
+                    update(BackgroundJob)
+                    .where(
+                        BackgroundJob.id == row_id,
+                        BackgroundJob.status.in_(("pending", "running")),
+                        BackgroundJob.updated_at < cutoff,
+                    )
+                    .values(status="pending", updated_at=_now())
+                )
+                db.commit()
+                if result.rowcount:
+                    claimed.append(_Job(name, json.loads(payload), attempts=attempts, row_id=row_id))
+            return claimed
+        finally:
+            db.close()
+
+
+job_queue = JobQueue()
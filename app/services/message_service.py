@@ -0,0 +1,343 @@
+# app/services/message_service.py
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from sqlalchemy import and_, func, insert, literal_column, select, text, tuple_, union
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import SessionLocal
+from app.models.group_member import GroupMember
+from app.models.message import Message, MESSAGE_SEARCH_TS_CONFIG
+from app.models.room import ChatRoom, RoomMember
+from app.models.user import User
+from app.schemas.message import MessageOut
+from app.websocket.history_cache import history_cache, HISTORY_CACHE_PER_ROOM
+
+# 그룹 커밋 설정
+# - 첫 메시지가 들어오면 WINDOW_MS 동안 모아서 한 번에 INSERT ... RETURNING + COMMIT 1회
+# - flush 가 진행되는 동안 들어온 메시지는 다음 배치로 자연스럽게 묶임
+MESSAGE_BATCH_WINDOW_MS = float(os.getenv("MESSAGE_BATCH_WINDOW_MS", "5"))
+MESSAGE_BATCH_MAX = int(os.getenv("MESSAGE_BATCH_MAX", "500"))
+
+
+def create_message(db: Session, room_id: int, user_id: int, content: str) -> Message:
+    msg = Message(
+        room_id=room_id,
+        user_id=user_id,
+        content=content,
+    )
+    db.add(msg)
+    db.commit()
+    db.refresh(msg)
+    return msg
+
+
+def list_messages(
+    db: Session,
+    room_id: int,
+    limit: int = 100,
+    before_id: int | None = None,
+    after_id: int | None = None,
+) -> list[MessageOut]:
+    """
+    방 메시지 keyset 조회 (오래된 → 최신 순으로 반환)
+    - 커서 없음   : 최신 limit 개
+    - before_id : 해당 메시지보다 이전 limit 개
+    - after_id  : 해당 메시지 이후 limit 개
+    최근 구간은 hot-tail 캐시에서 DB 없이 응답하고, 최신 구간 첫 조회 때 캐시를 채운다.
+    """
+    cached = history_cache.window(room_id, limit, before_id=before_id, after_id=after_id)
+    if cached is not None:
+        return [MessageOut(**m) for m in cached]
+
+    # 최신 구간 첫 조회 → 캐시 채우기 (DB 읽기 전에 등록해야 읽는 사이 온 메시지도 안 놓침)
+    seeding = before_id is None and after_id is None
+    fetch = max(limit, HISTORY_CACHE_PER_ROOM) if seeding else limit
+    if seeding:
+        history_cache.begin_seed(room_id)
+
+    # Message + User join
+    stmt = (
+        select(Message, User.nickname)
+        .join(User, Message.user_id == User.id, isouter=True)
+        .where(Message.room_id == room_id)
+    )
+
+    cursor_id = before_id or after_id
+    if cursor_id is not None:
+        # 커서 메시지의 created_at (PK 조회) → (room_id, created_at, id) 인덱스 범위 스캔 조건으로 사용
+        cursor_created_at = db.scalar(
+            select(Message.created_at).where(Message.room_id == room_id, Message.id == cursor_id)
+        )
+        if cursor_created_at is not None:
+            key = tuple_(Message.created_at, Message.id)
+            cursor = tuple_(cursor_created_at, cursor_id)
+            cond = key > cursor if after_id is not None else key < cursor
+        else:
+            # 커서 메시지가 지워진 경우(탈퇴 등) id 기준으로 이어감
+            cond = Message.id > cursor_id if after_id is not None else Message.id < cursor_id
+        stmt = stmt.where(cond)
+
+    if after_id is not None:
+        stmt = stmt.order_by(Message.created_at.asc(), Message.id.asc())
+    else:
+        stmt = stmt.order_by(Message.created_at.desc(), Message.id.desc())
+
+    rows = db.execute(stmt.limit(fetch)).all()
+    if after_id is None:
+        rows.reverse()
+
+    result: list[MessageOut] = []
+    for msg, nickname in rows:
+        result.append(
+            MessageOut(
+                id=msg.id,
+                room_id=msg.room_id,
+                user_id=msg.user_id,
+                content=msg.content,
+                created_at=msg.created_at,
+                user_nickname=nickname,
+            )
+        )
+
+    if seeding:
+        history_cache.seed(room_id, [m.model_dump() for m in result], complete=len(rows) < fetch)
+        result = result[-limit:]
+    return result
+
+
+def get_message(db: Session, room_id: int, message_id: int) -> MessageOut | None:
+    """메시지 한 건 (닉네임 포함). 없거나 다른 방 메시지면 None"""
+    row = db.execute(
+        select(Message, User.nickname)
+        .join(User, Message.user_id == User.id, isouter=True)
+        .where(Message.room_id == room_id, Message.id == message_id)
+    ).first()
+    if row is None:
+        return None
+    msg, nickname = row
+    return MessageOut(
+        id=msg.id,
+        room_id=msg.room_id,
+        user_id=msg.user_id,
+        content=msg.content,
+        created_at=msg.created_at,
+        user_nickname=nickname,
+    )
+
+
+# 검색어 토큰 최대 개수 (너무 긴 검색어로 인덱스를 여러 번 훑지 않도록)
+_SEARCH_MAX_TERMS = 8
+
+
+def _search_terms(q: str) -> list[str]:
+    # 따옴표/역슬래시는 FTS 문법과 충돌하므로 제거
+    cleaned = q.replace('"', " ").replace("'", " ").replace("\\", " ")
+    return cleaned.split()[:_SEARCH_MAX_TERMS]
+
+
+def _search_condition(db: Session, terms: list[str]):
+    """
+    DB 별 전문 검색 조건. 각 단어는 접두사 검색(회의 → 회의록을)이고 전부 AND.
+    - PostgreSQL: to_tsvector('simple', content) @@ to_tsquery(...)  → GIN 인덱스
+    - SQLite    : messages_fts MATCH (FTS5)
+    - 그 외      : LIKE (인덱스 없음)
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        ts_config = literal_column(f"'{MESSAGE_SEARCH_TS_CONFIG}'")
+        tsquery = " & ".join(f"'{t}':*" for t in terms)
+        return func.to_tsvector(ts_config, Message.content).op("@@")(func.to_tsquery(ts_config, tsquery))
+    if dialect == "sqlite":
+        match = " ".join(f'"{t}"*' for t in terms)
+        return Message.id.in_(
+            select(literal_column("rowid"))
+            .select_from(text("messages_fts"))
+            .where(text("messages_fts MATCH :match").bindparams(match=match))
+        )
+    return and_(*(Message.content.ilike(f"%{t}%") for t in terms))
+
+
+def search_messages(
+    db: Session,
+    user_id: int,
+    q: str,
+    room_id: int | None = None,
+    limit: int = 30,
+    before_id: int | None = None,
+) -> list[MessageOut]:
+    """
+    메시지 내용 검색 (최신 → 오래된 순)
+    - room_id 지정: 그 방 안에서만 (멤버 확인은 라우터에서)
+    - room_id 없음: 내가 속한 모든 방 (그룹 채팅방 + RoomMember 로 들어간 방)
+    - before_id : 다음 페이지 (이전 결과의 마지막 id)
+    """
+    terms = _search_terms(q)
+    if not terms:
+        return []
+
+    stmt = (
+        select(Message, User.nickname)
+        .join(User, Message.user_id == User.id, isouter=True)
+        .where(_search_condition(db, terms))
+    )
+
+    if room_id is not None:
+        stmt = stmt.where(Message.room_id == room_id)
+    else:
+        my_rooms = union(
+            select(ChatRoom.id)
+            .join(GroupMember, GroupMember.group_id == ChatRoom.group_id)
+            .where(GroupMember.user_id == user_id),
+            select(RoomMember.room_id).where(RoomMember.user_id == user_id),
+        )
+        stmt = stmt.where(Message.room_id.in_(my_rooms))
+
+    if before_id is not None:
+        stmt = stmt.where(Message.id < before_id)
+
+    rows = db.execute(stmt.order_by(Message.id.desc()).limit(limit)).all()
+    return [
+        MessageOut(
+            id=msg.id,
+            room_id=msg.room_id,
+            user_id=msg.user_id,
+            content=msg.content,
+            created_at=msg.created_at,
+            user_nickname=nickname,
+        )
+        for msg, nickname in rows
+    ]
+
+
+def insert_messages(db: Session, rows: list[dict]) -> list[tuple[int, datetime]]:
+    """여러 방의 메시지를 multi-row INSERT ... RETURNING 한 번 + COMMIT 한 번으로 저장."""
+    stmt = insert(Message).returning(
+        Message.id,
+        Message.created_at,
+        sort_by_parameter_order=True,  # 입력 순서대로 id 매칭
+    )
+    saved = [(row.id, row.created_at) for row in db.execute(stmt, rows)]
+    db.commit()
+    return saved
+
+
+class MessageWriter:
+    """
+    채팅 메시지 write-behind 파이프라인.
+    submit() 한 쪽은 자기 메시지의 id/created_at 이 확정(커밋)될 때까지 기다리지만,
+    실제 DB 작업은 전용 스레드 하나가 배치 단위로 처리한다.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        window_ms: float = MESSAGE_BATCH_WINDOW_MS,
+        max_batch: int = MESSAGE_BATCH_MAX,
+    ):
+        self.session_factory = session_factory
+        self.window = max(window_ms, 0) / 1000
+        self.max_batch = max_batch
+        self.queue: asyncio.Queue | None = None
+        self.task: asyncio.Task | None = None
+        self._executor: ThreadPoolExecutor | None = None
+
+    def start(self):
+        if self.task is not None:
+            return
+        self.queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="msg-writer")
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """남은 메시지까지 flush 하고 종료."""
+        if self.task is None:
+            return
+        await self.queue.put(None)
+        await self.task
+        self._executor.shutdown(wait=True)
+        self.task = None
+        self.queue = None
+        self._executor = None
+
+    async def submit(self, room_id: int, user_id: int, content: str) -> Message:
+        if self.task is None:
+            self.start()
+        row = {
+            "room_id": room_id,
+            "user_id": user_id,
+            "content": content,
+            # 큐에 들어온 순서 = 시간 순서가 되도록 여기서 찍음
+            "created_at": datetime.now(timezone.utc),
+        }
+        fut = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((row, fut))
+        msg_id, created_at = await fut
+        return Message(id=msg_id, created_at=created_at, **{k: row[k] for k in ("room_id", "user_id", "content")})
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+
+            if self.window:
+                await asyncio.sleep(self.window)
+            while len(batch) < self.max_batch and not self.queue.empty():
+                item = self.queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            rows = [row for row, _ in batch]
+            try:
+                saved = await loop.run_in_executor(self._executor, self._flush, rows)
+            except Exception as e:
+                print(f"[MSG] batch insert failed ({len(rows)} rows): {e}")
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            for (_, fut), result in zip(batch, saved):
+                if fut.done():  # 보낸 쪽이 이미 끊김
+                    continue
+                if isinstance(result, Exception):
+                    fut.set_exception(result)
+                else:
+                    fut.set_result(result)
+
+    def _flush(self, rows: list[dict]) -> list:
+        db = self.session_factory()
+        try:
+            try:
+                return insert_messages(db, rows)
+            except Exception:
+                db.rollback()
+                if len(rows) == 1:
+                    raise
+            # 배치 중 한 줄(예: 없는 방)이 실패하면 한 줄씩 다시 저장해서 나머지는 살림
+            results = []
+            for row in rows:
+                try:
+                    results.extend(insert_messages(db, [row]))
+                except Exception as e:
+                    db.rollback()
+                    results.append(e)
+            return results
+        finally:
+            db.close()
+
+
+message_writer = MessageWriter()
+
+
+async def save_message(room_id: int, user_id: int, content: str) -> Message:
+    """이벤트 루프를 막지 않고 메시지 저장. 반환값은 id/created_at 이 채워진 (transient) Message."""
+    return await message_writer.submit(room_id, user_id, content)
@@ -1,14 +1,20 @@
 # app/services/post_service.py
+import os
 from typing import List
 
 from fastapi import HTTPException, status
+from sqlalchemy import delete, exists, func, literal, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session, joinedload
 
 from pathlib import Path
 from app.core.paths import delete_static_file
+from app.services.job_queue import job_handler, job_queue
 from app.models.post import Post, PostLike, PostComment
 from app.models.group import Group
 from app.models.user import User
+from app.utils.user_cache import CachedUser
 from app.schemas.post import (
     PostCreate,
     PostSummaryOut,
@@ -19,10 +25,15 @@ from app.schemas.post import (
     AuthorInfo,
 )
 
+POST_PAGE_SIZE = 20
+# 게시글 상세에 같이 내려주는 최신 댓글 수 (나머지는 댓글 목록 API 로 before_id 페이지)
+POST_DETAIL_COMMENTS = int(os.getenv("POST_DETAIL_COMMENTS", "20"))
+COMMENT_PAGE_SIZE = 50
+
 APP_DIR = Path(__file__).resolve().parents[1]
 STATIC_DIR = APP_DIR / "static"
 
-def _build_author_info(user: User) -> AuthorInfo:
+def _build_author_info(user: User | CachedUser) -> AuthorInfo:
     return AuthorInfo(
         id=user.id,
         name=user.name,
@@ -39,6 +50,67 @@ def _build_comment_out(comment: PostComment) -> CommentOut:
     )
 
 
+def _is_liked(user_id: int):
+    return (
+        exists()
+        .where(PostLike.post_id == Post.id, PostLike.user_id == user_id)
+        .label("is_liked")
+    )
+
+
+def _bump_counts(db: Session, post_id: int, likes: int = 0, comments: int = 0) -> tuple[int, int] | None:
+    """
+    posts.like_count / comment_count 를 DB 에서 원자적으로 +/- (읽고 쓰는 사이 경합 없음).
+    좋아요/댓글 INSERT·DELETE 와 같은 트랜잭션에서 호출하고 커밋은 호출한 쪽에서.
+    """
+    row = db.execute(
+        update(Post)
+        .where(Post.id == post_id)
+        .values(
+            like_count=Post.like_count + likes,
+            comment_count=Post.comment_count + comments,
+            updated_at=Post.updated_at,  # 개수만 바뀐 건 글 수정이 아님 (onupdate 안 타게)
+        )
+        .returning(Post.like_count, Post.comment_count)
+    ).first()
+    return tuple(row) if row else None
+
+
+def release_user_counts(db: Session, user_id: int) -> None:
+    """
+    탈퇴 직전: 이 유저의 좋아요/댓글이 cascade 로 지워질 게시글들의 개수를 미리 빼 둠.
+    (user 삭제와 같은 트랜잭션에서 호출)
+    """
+    liked = (
+        select(func.count(PostLike.id))
+        .where(PostLike.post_id == Post.id, PostLike.user_id == user_id)
+        .correlate(Post)
+        .scalar_subquery()
+    )
+    commented = (
+        select(func.count(PostComment.id))
+        .where(PostComment.post_id == Post.id, PostComment.author_id == user_id)
+        .correlate(Post)
+        .scalar_subquery()
+    )
+    db.execute(
+        update(Post)
+        .where(
+            Post.author_id != user_id,  # 본인 글은 글째로 지워짐
+            Post.id.in_(
+                select(PostLike.post_id).where(PostLike.user_id == user_id)
+                .union(select(PostComment.post_id).where(PostComment.author_id == user_id))
+            ),
+        )
+        .values(
+            like_count=Post.like_count - liked,
+            comment_count=Post.comment_count - commented,
+            updated_at=Post.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
 def _get_group_or_404(db: Session, group_id: int) -> Group:
     group = db.query(Group).filter(Group.id == group_id).first()
     if not group:
@@ -46,40 +118,108 @@ def _get_group_or_404(db: Session, group_id: int) -> Group:
     return group
 
 
+def _comment_page(
+    db: Session,
+    post_id: int,
+    limit: int,
+    before_id: int | None = None,
+    after_id: int | None = None,
+) -> List[PostComment]:
+    """
+    댓글 keyset 조회 (오래된 → 최신 순으로 반환), (post_id, created_at, id) 인덱스 범위 스캔
+    - 커서 없음   : 최신 limit 개
+    - before_id : 해당 댓글보다 이전 limit 개
+    - after_id  : 해당 댓글 이후 limit 개
+    """
+    query = (
+        db.query(PostComment)
+        .options(joinedload(PostComment.author))
+        .filter(PostComment.post_id == post_id)
+    )
+
+    cursor_id = before_id or after_id
+    if cursor_id is not None:
+        # created_at 은 서브쿼리로 비교 (list_posts 와 같은 이유)
+        cursor_created_at = (
+            select(PostComment.created_at)
+            .where(PostComment.post_id == post_id, PostComment.id == cursor_id)
+            .scalar_subquery()
+        )
+        if db.scalar(select(cursor_created_at)) is not None:
+            key = tuple_(PostComment.created_at, PostComment.id)
+            cursor = tuple_(cursor_created_at, cursor_id)
+            cond = key > cursor if after_id is not None else key < cursor
+        else:
+            # 커서 댓글이 지워진 경우 id 기준으로 이어감
+            cond = PostComment.id > cursor_id if after_id is not None else PostComment.id < cursor_id
+        query = query.filter(cond)
+
+    if after_id is not None:
+        query = query.order_by(PostComment.created_at.asc(), PostComment.id.asc())
+    else:
+        query = query.order_by(PostComment.created_at.desc(), PostComment.id.desc())
+
+    comments = query.limit(limit).all()
+    if after_id is None:
+        comments.reverse()
+    return comments
+
+
 # ─────────────────────────────
 # 게시글 목록
 # ─────────────────────────────
 def list_posts(
     db: Session,
-    user: User,
+    user: CachedUser,
     group_id: int,
-    from_: int,
-    to: int,
+    from_: int = 0,
+    to: int = 19,
+    before_id: int | None = None,
+    limit: int | None = None,
 ) -> List[PostSummaryOut]:
+    """
+    그룹 게시글 목록 (최신순)
+    - before_id/limit : keyset 페이지. before_id = 이전 페이지 마지막 글 id
+                        (group_id, created_at, id) 인덱스 범위 스캔이라 몇 번째 페이지든 비용 같음,
+                        새 글이 올라와도 다음 페이지가 밀리지 않음
+    - from_/to        : 예전 클라이언트용 OFFSET 방식 (before_id, limit 둘 다 없을 때)
+    """
     _get_group_or_404(db, group_id)
 
-    limit = max(0, to - from_ + 1)
-
-    posts: List[Post] = (
-        db.query(Post)
-        .options(
-            joinedload(Post.author),
-            joinedload(Post.likes),
-            joinedload(Post.comments),
-        )
+    # 좋아요/댓글 개수는 posts 에 저장된 값, 내가 눌렀는지만 EXISTS (ix_post_likes_post_user)
+    # → 좋아요/댓글 테이블은 페이지 크기만큼만 인덱스 조회, 인기글이 있어도 비용 같음
+    query = (
+        db.query(Post, _is_liked(user.id))
+        .options(joinedload(Post.author))
         .filter(Post.group_id == group_id)
-        .order_by(Post.created_at.desc())
-        .offset(from_)
-        .limit(limit)
-        .all()
+        .order_by(Post.created_at.desc(), Post.id.desc())
     )
 
-    result: List[PostSummaryOut] = []
-    for p in posts:
-        like_count = len(p.likes)
-        comment_count = len(p.comments)
-        is_liked = any(l.user_id == user.id for l in p.likes)
+    if before_id is None and limit is None:
+        query = query.offset(from_).limit(max(0, to - from_ + 1))
+    else:
+        if before_id is not None:
+            # 커서 글의 created_at (PK 조회) → (created_at, id) 보다 작은 것
+            # created_at 은 파이썬 값으로 다시 바인딩하지 않고 서브쿼리로 비교
+            # (SQLite 는 server_default 시각을 문자열로 저장해서 형식이 달라지면 같은 글이 또 나옴)
+            cursor_created_at = (
+                select(Post.created_at)
+                .where(Post.group_id == group_id, Post.id == before_id)
+                .scalar_subquery()
+            )
+            if db.scalar(select(cursor_created_at)) is not None:
+                query = query.filter(
+                    tuple_(Post.created_at, Post.id) < tuple_(cursor_created_at, before_id)
+                )
+            else:
+                # 커서 글이 지워진 경우 id 기준으로 이어감
+                query = query.filter(Post.id < before_id)
+        query = query.limit(limit or POST_PAGE_SIZE)
 
+    rows = query.all()
+
+    result: List[PostSummaryOut] = []
+    for p, is_liked in rows:
         result.append(
             PostSummaryOut(
                 id=p.id,
@@ -88,9 +228,9 @@ def list_posts(
                 content=p.content,
                 author=_build_author_info(p.author),
                 created_at=p.created_at,
-                like_count=like_count,
-                comment_count=comment_count,
-                is_liked=is_liked,
+                like_count=p.like_count or 0,
+                comment_count=p.comment_count or 0,
+                is_liked=bool(is_liked),
                 image_urls=getattr(p, "image_urls", []) or [],
             )
         )
@@ -103,7 +243,7 @@ def list_posts(
 # ─────────────────────────────
 def create_post(
     db: Session,
-    user: User,
+    user: CachedUser,
     group_id: int,
     body: PostCreate,
 ) -> PostDetailOut:
@@ -140,27 +280,24 @@ def create_post(
 # ─────────────────────────────
 def get_post_detail(
     db: Session,
-    user: User,
+    user: CachedUser,
     group_id: int,
     post_id: int,
 ) -> PostDetailOut:
-    post: Post | None = (
-        db.query(Post)
-        .options(
-            joinedload(Post.author),
-            joinedload(Post.likes),
-            joinedload(Post.comments).joinedload(PostComment.author),
-        )
+    row = (
+        db.query(Post, _is_liked(user.id))
+        .options(joinedload(Post.author))
         .filter(Post.group_id == group_id, Post.id == post_id)
         .first()
     )
 
-    if not post:
+    if not row:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    like_count = len(post.likes)
-    is_liked = any(l.user_id == user.id for l in post.likes)
-    comments_out = [_build_comment_out(c) for c in post.comments]
+    post, is_liked = row
+    like_count = post.like_count or 0
+    # 댓글은 전부 싣지 않고 최신 POST_DETAIL_COMMENTS 개만 + 전체 개수
+    comments_out = [_build_comment_out(c) for c in _comment_page(db, post.id, POST_DETAIL_COMMENTS)]
 
     return PostDetailOut(
         id=post.id,
@@ -170,58 +307,99 @@ def get_post_detail(
         author=_build_author_info(post.author),
         created_at=post.created_at,
         like_count=like_count,
-        is_liked=is_liked,
+        is_liked=bool(is_liked),
+        comment_count=post.comment_count or 0,
         comments=comments_out,
         image_urls=post.image_urls or [],
     )
 
 
 # ─────────────────────────────
-# 좋아요 토글
+# 좋아요 / 좋아요 취소
 # ─────────────────────────────
-def toggle_like(
-    db: Session,
-    user: User,
-    group_id: int,
-    post_id: int,
-) -> LikeOut:
-    post = (
-        db.query(Post)
-        .filter(Post.group_id == group_id, Post.id == post_id)
-        .first()
-    )
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
+def _set_like(db: Session, user_id: int, group_id: int, post_id: int, liked: bool) -> int | None:
+    """
+    좋아요 추가(liked=True)/취소 + posts.like_count 반영. 반환: 바뀐 뒤 like_count (게시글 없으면 None)
+    - INSERT ... ON CONFLICT DO NOTHING / DELETE ... RETURNING 이라 이미 눌렀는데 또 누르거나(더블탭)
+      없는데 취소해도 에러 없이 개수 그대로 (uq_post_likes_post_user 유니크 인덱스)
+    - PostgreSQL: 위 문장을 CTE 로 묶어서 UPDATE posts 와 한 문장 (DB 왕복 1번)
+    - 그 외(SQLite): 같은 트랜잭션에서 두 문장
+    커밋은 호출한 쪽에서.
+    """
+    dialect = db.get_bind().dialect.name
+    post_in_group = exists().where(Post.id == post_id, Post.group_id == group_id)
+
+    if liked:
+        insert_fn = pg_insert if dialect == "postgresql" else sqlite_insert
+        change = (
+            insert_fn(PostLike)
+            .from_select(
+                ["post_id", "user_id"],
+                select(literal(post_id), literal(user_id)).where(post_in_group),
+            )
+            .on_conflict_do_nothing(index_elements=["post_id", "user_id"])
+            .returning(PostLike.post_id)
+        )
+    else:
+        change = (
+            delete(PostLike)
+            .where(PostLike.post_id == post_id, PostLike.user_id == user_id, post_in_group)
+            .returning(PostLike.post_id)
+        )
 
-    existing = (
-        db.query(PostLike)
-        .filter(PostLike.post_id == post_id, PostLike.user_id == user.id)
-        .first()
+    bump = (
+        update(Post)
+        .where(Post.id == post_id, Post.group_id == group_id)
+        .returning(Post.like_count)
+        .execution_options(synchronize_session=False)
     )
 
-    if existing:
-        db.delete(existing)
-        liked = False
+    if dialect == "postgresql":
+        changed = change.cte("changed")
+        delta = select(func.count()).select_from(changed).scalar_subquery()
+        bump = bump.add_cte(changed)
     else:
-        like = PostLike(post_id=post_id, user_id=user.id)
-        db.add(like)
-        liked = True
+        delta = len(db.execute(change).all())
 
-    db.commit()
+    like_count = Post.like_count + delta if liked else Post.like_count - delta
+    return db.execute(bump.values(like_count=like_count, updated_at=Post.updated_at)).scalar()
 
-    like_count = (
-        db.query(PostLike).filter(PostLike.post_id == post_id).count()
-    )
 
+def set_like(
+    db: Session,
+    user: CachedUser,
+    group_id: int,
+    post_id: int,
+    liked: bool,
+) -> LikeOut:
+    """PUT(liked=True) / DELETE(liked=False) — 몇 번을 보내도 결과가 같음"""
+    like_count = _set_like(db, user.id, group_id, post_id, liked)
+    if like_count is None:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Post not found")
+    db.commit()
     return LikeOut(liked=liked, like_count=like_count)
 
 
+def toggle_like(
+    db: Session,
+    user: CachedUser,
+    group_id: int,
+    post_id: int,
+) -> LikeOut:
+    """예전 클라이언트용 토글 (새 클라이언트는 PUT/DELETE 사용)"""
+    liked_now = db.scalar(
+        select(exists().where(PostLike.post_id == post_id, PostLike.user_id == user.id))
+    )
+    return set_like(db, user, group_id, post_id, liked=not liked_now)
+
+
 # ─────────────────────────────
 # 댓글 생성
 # ─────────────────────────────
 def create_comment(
     db: Session,
-    user: User,
+    user: CachedUser,
     group_id: int,
     post_id: int,
     body: CommentCreate,
@@ -241,6 +419,8 @@ def create_comment(
     )
 
     db.add(comment)
+    db.flush()
+    _bump_counts(db, post_id, comments=1)
     db.commit()
     db.refresh(comment)
 
@@ -252,9 +432,12 @@ def create_comment(
 # ─────────────────────────────
 def list_comments(
     db: Session,
-    user: User,   # 사용 여부 상관없이 형태 통일용
+    user: CachedUser,   # 사용 여부 상관없이 형태 통일용
     group_id: int,
     post_id: int,
+    limit: int = COMMENT_PAGE_SIZE,
+    before_id: int | None = None,
+    after_id: int | None = None,
 ) -> List[CommentOut]:
     post = (
         db.query(Post)
@@ -264,14 +447,7 @@ def list_comments(
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    comments: List[PostComment] = (
-        db.query(PostComment)
-        .options(joinedload(PostComment.author))
-        .filter(PostComment.post_id == post_id)
-        .order_by(PostComment.created_at.asc())
-        .all()
-    )
-
+    comments = _comment_page(db, post_id, limit, before_id=before_id, after_id=after_id)
     return [_build_comment_out(c) for c in comments]
 
 
@@ -280,7 +456,7 @@ def list_comments(
 # ─────────────────────────────
 def delete_comment(
     db: Session,
-    user: User,
+    user: CachedUser,
     group_id: int,
     post_id: int,
     comment_id: int,
@@ -306,12 +482,20 @@ def delete_comment(
         )
 
     db.delete(comment)
+    db.flush()
+    _bump_counts(db, post_id, comments=-1)
     db.commit()
 
 
 # ─────────────────────────────
 # 게시물 삭제
 # ─────────────────────────────
+@job_handler("delete_static_files")
+def delete_static_files(urls: list[str]) -> None:
+    for url in urls:
+        delete_static_file(url)
+
+
 def _url_to_file_path(url: str) -> Path | None:
     """
     /static/group_images/xxx.png  또는
@@ -336,7 +520,7 @@ def _url_to_file_path(url: str) -> Path | None:
 
 def delete_post(
     db: Session,
-    user: User,
+    user: CachedUser,
     group_id: int,
     post_id: int,
 ) -> None:
@@ -362,11 +546,12 @@ def delete_post(
             detail="게시글을 삭제할 권한이 없습니다.",
         )
 
-    # 🔥 1) 이미지 파일부터 삭제
-    if getattr(post, "image_urls", None):
-        for url in post.image_urls:
-            delete_static_file(url)
+    image_urls = list(getattr(post, "image_urls", None) or [])
 
-    # 🔥 2) 게시글 삭제 (likes/comments는 cascade)
+    # 🔥 1) 게시글 삭제 (likes/comments는 cascade, 개수 컬럼도 글과 함께 사라짐)
     db.delete(post)
-    db.commit()
\ No newline at end of file
+    db.commit()
+
+    # 🔥 2) 이미지 파일은 커밋 후 백그라운드에서 삭제 (응답은 바로)
+    if image_urls:
+        job_queue.enqueue("delete_static_files", urls=image_urls)
\ No newline at end of file
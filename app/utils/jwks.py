@@ -0,0 +1,92 @@
+# app/utils/jwks.py
+"""
+JWKS(공개키 목록) 캐시.
+
+- kid -> 파싱된 공개키(PyJWK) 를 메모리에 보관 → 토큰 검증 때 네트워크/JWK 파싱 없음
+- JWKS_TTL 이 지나면 기존 키로 계속 응답하면서 백그라운드 스레드에서 갱신
+- 모르는 kid(키 교체 직후)면 그 자리에서 다시 받아옴
+  · 동시에 여러 요청이 와도 실제 요청은 한 번 (single-flight)
+  · 이상한 kid 로 계속 두드려도 JWKS_MIN_REFETCH 초에 한 번만 받아옴
+"""
+import os
+import threading
+import time
+
+import httpx
+import jwt  # PyJWT
+
+JWKS_TTL = float(os.getenv("JWKS_TTL", "3600"))
+JWKS_MIN_REFETCH = float(os.getenv("JWKS_MIN_REFETCH", "30"))
+JWKS_FETCH_TIMEOUT = float(os.getenv("JWKS_FETCH_TIMEOUT", "5"))
+
+
+class JWKSCache:
+    def __init__(self, url: str, ttl: float = JWKS_TTL, min_refetch: float = JWKS_MIN_REFETCH):
+        self.url = url
+        self.ttl = ttl
+        self.min_refetch = min_refetch
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._fetched_at = 0.0                  # 마지막으로 성공한 시각
+        self._attempted_at: float | None = None  # 마지막으로 시도한 시각 (실패 포함)
+        self._fetch_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._refreshing = False
+
+    def get_key(self, kid: str) -> jwt.PyJWK:
+        key = self._keys.get(kid)
+        if key is not None:
+            if time.monotonic() - self._fetched_at > self.ttl:
+                self._refresh_in_background()
+            return key
+
+        # 모르는 kid → 바로 다시 받아봄 (다른 스레드가 받는 중이면 그걸 기다림)
+        self._fetch(force=False)
+        key = self._keys.get(kid)
+        if key is None:
+            raise KeyError(f"JWK not found: {kid}")
+        return key
+
+    def _refresh_in_background(self) -> None:
+        with self._state_lock:
+            attempted = self._attempted_at
+            if self._refreshing or (attempted is not None and time.monotonic() - attempted < self.min_refetch):
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self._fetch(force=True)
+            except Exception as e:
+                print(f"[JWKS] background refresh failed: {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="jwks-refresh", daemon=True).start()
+
+    def _fetch(self, force: bool) -> None:
+        started = time.monotonic()
+        with self._fetch_lock:
+            # 기다리는 동안 다른 스레드가 이미 받아왔거나, 너무 최근에 시도했으면 생략
+            if self._attempted_at is not None:
+                if self._attempted_at >= started:
+                    return
+                if not force and started - self._attempted_at < self.min_refetch:
+                    return
+            self._attempted_at = time.monotonic()
+            keys = self._download()
+            self._keys = keys
+            self._fetched_at = time.monotonic()
+
+    def _download(self) -> dict[str, jwt.PyJWK]:
+        r = httpx.get(self.url, timeout=JWKS_FETCH_TIMEOUT)
+        r.raise_for_status()
+        keys: dict[str, jwt.PyJWK] = {}
+        for data in r.json().get("keys", []):
+            kid = data.get("kid")
+            if not kid:
+                continue
+            try:
+                keys[kid] = jwt.PyJWK(data)
+            except jwt.PyJWKError as e:
+                print(f"[JWKS] skip key {kid}: {e}")
+        return keys
@@ -0,0 +1,181 @@
+# app/utils/mailer.py
+"""
+SMTP 메일 발송기: 연결 재사용 + 배치 발송 + 요청 밖 비동기 처리.
+
+- SMTP_POOL_SIZE 개의 발송 스레드가 각자 SMTP 연결을 하나씩 열어두고 재사용
+  (메일마다 TCP 연결/TLS 핸드셰이크/로그인을 새로 하지 않음)
+- 큐에 쌓인 메일은 한 연결로 최대 SMTP_BATCH_MAX 개씩 연달아 전송
+- SMTP_IDLE_TIMEOUT 초 동안 보낼 게 없으면 연결을 닫고, 다음 메일 때 다시 연결
+- 연결이 끊겨 있으면(서버 timeout 등) 한 번 다시 연결해서 재전송
+
+submit() 은 바로 Future 를 돌려주고, send() 는 발송 결과까지 기다린다.
+async 코드(백그라운드 작업)에서는 await asyncio.wrap_future(mailer.submit(msg)) 로 기다린다
+(작업 스레드를 SMTP 대기로 붙잡지 않음).
+
+로컬 테스트 (TLS/로그인 없는 가짜 SMTP 서버):
+    python -m aiosmtpd -n -l localhost:8025
+    SMTP_HOST=localhost SMTP_PORT=8025 SMTP_STARTTLS=0 uvicorn app.main:app
+"""
+import os
+import queue
+import smtplib
+import socket
+import threading
+from concurrent.futures import Future
+from email.message import EmailMessage
+
+SMTP_HOST = os.getenv("SMTP_HOST", "")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USER = os.getenv("SMTP_USER", "")
+SMTP_PASS = os.getenv("SMTP_PASS", "")
+SMTP_FROM = os.getenv("SMTP_FROM", SMTP_USER or "noreply@example.com")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1").strip().lower() in ("1", "true", "yes")
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "10"))
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "2"))
+SMTP_BATCH_MAX = int(os.getenv("SMTP_BATCH_MAX", "50"))
+SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", "30"))
+
+# 연결 자체의 문제 → 다시 연결해서 한 번 더 시도
+# (SMTPException 은 OSError 의 하위 클래스라 OSError 로 잡으면 수신자 거부까지 재연결하게 됨)
+_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, socket.timeout)
+
+
+class SMTPMailer:
+    def __init__(
+        self,
+        host: str = SMTP_HOST,
+        port: int = SMTP_PORT,
+        user: str = SMTP_USER,
+        password: str = SMTP_PASS,
+        starttls: bool = SMTP_STARTTLS,
+        pool_size: int = SMTP_POOL_SIZE,
+        batch_max: int = SMTP_BATCH_MAX,
+        idle_timeout: float = SMTP_IDLE_TIMEOUT,
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.pool_size = max(pool_size, 1)
+        self.batch_max = max(batch_max, 1)
+        self.idle_timeout = idle_timeout
+        self._queue: "queue.Queue[tuple[EmailMessage, Future] | None]" = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self.counters = {"sent": 0, "failed": 0, "connections": 0}
+
+    def submit(self, msg: EmailMessage) -> Future:
+        self._ensure_started()
+        fut: Future = Future()
+        self._queue.put((msg, fut))
+        return fut
+
+    def send(self, msg: EmailMessage, timeout: float | None = None) -> None:
+        """발송 완료까지 기다림 (실패하면 예외 → 호출한 작업이 재시도)"""
+        self.submit(msg).result(timeout)
+
+    def close(self, timeout: float = 5) -> None:
+        """큐에 남은 메일까지 보내고 연결 종료"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for t in threads:
+            t.join(timeout)
+
+    # ── 내부 ─────────────────────────────────────────────
+    def _ensure_started(self):
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.pool_size):
+                t = threading.Thread(target=self._run, name=f"smtp-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def _connect(self) -> smtplib.SMTP:
+        conn = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+        try:
+            conn.ehlo()
+            if self.starttls:
+                conn.starttls()
+                conn.ehlo()
+            if self.user:
+                conn.login(self.user, self.password)
+        except Exception:
+            conn.close()
+            raise
+        self.counters["connections"] += 1
+        return conn
+
+    @staticmethod
+    def _quit(conn: smtplib.SMTP | None) -> None:
+        if conn is None:
+            return None
+        try:
+            conn.quit()
+        except Exception:
+            conn.close()
+        return None
+
+    def _run(self):
+        conn: smtplib.SMTP | None = None
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                conn = self._quit(conn)  # 한동안 보낼 게 없으면 연결 정리
+                continue
+            if item is None:
+                break
+
+            batch = [item]
+            while len(batch) < self.batch_max:
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stopping = True
+                    break
+                batch.append(nxt)
+
+            conn = self._send_batch(conn, batch)
+        self._quit(conn)
+
+    def _send_batch(self, conn: smtplib.SMTP | None, batch: list) -> smtplib.SMTP | None:
+        for msg, fut in batch:
+            if not fut.set_running_or_notify_cancel():
+                continue
+            for attempt in (1, 2):
+                try:
+                    if conn is None:
+                        conn = self._connect()
+                    conn.send_message(msg)
+                    self.counters["sent"] += 1
+                    fut.set_result(None)
+                    break
+                except _CONNECTION_ERRORS as e:
+                    conn = self._quit(conn)
+                    if attempt == 2:
+                        self.counters["failed"] += 1
+                        fut.set_exception(e)
+                except smtplib.SMTPException as e:
+                    # 수신자 거부 등 메일 한 통의 문제 → 연결은 그대로 두고 다음 메일
+                    self.counters["failed"] += 1
+                    fut.set_exception(e)
+                    break
+                except Exception as e:
+                    # 접속 실패(DNS, TLS 등) → 이 메일은 실패 처리, 다음 메일 때 다시 연결
+                    conn = self._quit(conn)
+                    self.counters["failed"] += 1
+                    fut.set_exception(e)
+                    break
+        return conn
+
+
+mailer = SMTPMailer()
@@ -1,9 +1,12 @@
 # app/utils/security.py
-import os, datetime as dt, hashlib, hmac, random, smtplib
+import asyncio, os, datetime as dt, hashlib, hmac, random
 import jwt  # PyJWT
 from passlib.context import CryptContext
 from email.message import EmailMessage
 
+from app.services.job_queue import job_handler
+from app.utils.mailer import mailer, SMTP_HOST, SMTP_FROM
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # 비밀번호 해시/검증
@@ -20,11 +23,6 @@ JWT_EXPIRE_MIN = int(os.getenv("JWT_EXPIRE_MIN", "43200"))
 
 # 이메일 인증 코드 관련
 EMAIL_SECRET = os.getenv("EMAIL_SECRET", "dev-email-secret")  # 코드 해시 pepper
-SMTP_HOST = os.getenv("SMTP_HOST", "")
-SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
-SMTP_USER = os.getenv("SMTP_USER", "")
-SMTP_PASS = os.getenv("SMTP_PASS", "")
-SMTP_FROM = os.getenv("SMTP_FROM", SMTP_USER or "noreply@example.com")
 
 def create_access_token(claims: dict) -> str:
     now = dt.datetime.utcnow()
@@ -45,7 +43,10 @@ def hash_code(code: str) -> str:
 def verify_code(code: str, code_hash: str) -> bool:
     return hmac.compare_digest(hash_code(code), code_hash)
 
-def send_email_code(to_email: str, code: str):
+# 요청 처리 중에는 job_queue.enqueue("send_email_code", ...) 로 넣고 워커가 발송
+# (인증코드 평문이 DB 에 남지 않도록 작업 테이블에는 기록하지 않음)
+@job_handler("send_email_code", persist=False)
+async def send_email_code(to_email: str, code: str):
     """SMTP가 없으면 개발 모드로 콘솔에만 출력."""
     subject = "[Moyo] 이메일 인증코드"
     body = f"인증코드: {code}\n10분 이내에 입력해 주세요."
@@ -57,8 +58,6 @@ def send_email_code(to_email: str, code: str):
     msg["From"] = SMTP_FROM
     msg["To"] = to_email
     msg.set_content(body)
-    with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as s:
-        s.starttls()
-        if SMTP_USER:
-            s.login(SMTP_USER, SMTP_PASS)
-        s.send_message(msg)
\ No newline at end of file
+    # 열어둔 SMTP 연결로 발송 (연결/TLS/로그인은 mailer 가 재사용), 실패하면 작업 재시도
+    # 이벤트 루프에서 결과만 기다림 → 작업 스레드를 붙잡지 않고, 타임아웃으로 중복 발송되는 일도 없음
+    await asyncio.wrap_future(mailer.submit(msg))
\ No newline at end of file
@@ -0,0 +1,132 @@
+# app/utils/user_cache.py
+"""
+로그인 유저 조회용 짧은 TTL 캐시.
+토큰의 uid(없으면 예전 토큰의 subject email) → 가벼운 유저 스냅샷(CachedUser).
+캐시 미스일 때만 DB 를 잠깐 쓰고 바로 반납한다.
+
+닉네임/프로필 이미지 변경, 탈퇴 시 invalidate_user() 로 지운다.
+캐시는 프로세스마다 따로라서 다른 워커 프로세스에는 최대 USER_CACHE_TTL 초 동안 예전 값이 보일 수 있다.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models.user import User
+
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+USER_CACHE_MAX = int(os.getenv("USER_CACHE_MAX", "10000"))
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """ORM 세션과 무관한 유저 스냅샷 (요청/소켓 사이에 공유해도 안전)"""
+    id: int
+    email: str
+    name: str
+    nickname: str
+    is_active: bool
+    profile_image_url: str | None = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "CachedUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            nickname=user.nickname,
+            is_active=user.is_active,
+            profile_image_url=user.profile_image_url,
+        )
+
+
+class TTLCache:
+    def __init__(self, ttl: float = USER_CACHE_TTL, maxsize: int = USER_CACHE_MAX):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                self._data.pop(key, None)
+                return None
+            return value
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            if len(self._data) >= self.maxsize:
+                # 만료된 것부터 정리, 그래도 꽉 차 있으면 가장 오래 전에 넣은 것 제거
+                now = time.monotonic()
+                for k in [k for k, (exp, _) in self._data.items() if exp < now]:
+                    del self._data[k]
+                while len(self._data) >= self.maxsize:
+                    self._data.pop(next(iter(self._data)))
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def pop(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_users_by_id = TTLCache()
+_users_by_email = TTLCache()
+
+
+def _remember(cached: CachedUser) -> None:
+    _users_by_id.set(cached.id, cached)
+    _users_by_email.set(cached.email, cached)
+
+
+def _load(where) -> CachedUser | None:
+    db = SessionLocal()
+    try:
+        user = db.execute(select(User).where(where)).scalar_one_or_none()
+        if not user:
+            return None
+        cached = CachedUser.from_user(user)
+    finally:
+        db.close()  # 커넥션은 바로 풀에 반납
+
+    _remember(cached)
+    return cached
+
+
+def get_user_by_id(user_id: int, load: bool = True) -> CachedUser | None:
+    """load=False 면 캐시만 본다 (이벤트 루프에서 DB 없이 확인할 때)"""
+    cached = _users_by_id.get(user_id)
+    if cached is not None or not load:
+        return cached
+    return _load(User.id == user_id)
+
+
+def get_user_by_email(email: str, load: bool = True) -> CachedUser | None:
+    cached = _users_by_email.get(email)
+    if cached is not None or not load:
+        return cached
+    return _load(User.email == email)
+
+
+def cache_user(user: User) -> CachedUser:
+    """방금 수정/커밋한 ORM 유저로 캐시를 바로 갱신"""
+    cached = CachedUser.from_user(user)
+    _remember(cached)
+    return cached
+
+
+def invalidate_user(user_id: int, email: str | None = None) -> None:
+    _users_by_id.pop(user_id)
+    if email:
+        _users_by_email.pop(email)
@@ -0,0 +1,344 @@
+# app/websocket/backplane.py
+"""
+채팅 브로드캐스트 백플레인.
+
+ConnectionManager.broadcast 는 메시지를 바로 소켓에 쓰지 않고 백플레인에 publish 하고,
+백플레인이 각 워커(프로세스)의 로컬 소켓 전달 함수(deliver)를 호출해 준다.
+
+- memory   : 단일 프로세스 기본값 (publish → 즉시 로컬 전달)
+- postgres : Postgres LISTEN/NOTIFY 로 같은 DB를 보는 모든 워커/노드에 전달
+             (uvicorn --workers N, 여러 서버 구성에서도 sticky session 불필요)
+
+WS_BACKPLANE 환경변수로 선택한다.
+"""
+import asyncio
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Optional
+
+# (room_id, 인코딩된 JSON 텍스트, seq=메시지 id 또는 None) -> 로컬 소켓 전달
+DeliverFn = Callable[[int, str, Optional[int]], Awaitable[None]]
+# (room_id, 메시지 id) -> 인코딩된 JSON 텍스트 (DB 에서 다시 만듦, 없으면 None). 스레드에서 호출됨
+LoadFn = Callable[[int, int], Optional[str]]
+# 백플레인이 끊겼다 다시 붙었을 때 (그 사이 다른 워커 메시지를 놓쳤을 수 있음)
+ResyncFn = Callable[[], None]
+# (room_id, 인코딩된 JSON 제어 이벤트) -> 캐시 무효화 등 워커 내부 처리 (소켓으로는 안 감)
+ControlFn = Callable[[int, str], None]
+
+WS_BACKPLANE = os.getenv("WS_BACKPLANE", "memory").strip().lower()
+WS_PG_CHANNEL = os.getenv("WS_PG_CHANNEL", "moyo_ws")
+
+# Postgres NOTIFY payload 최대 8000 bytes (여유 있게 잡음)
+PG_NOTIFY_MAX_BYTES = 7900
+# LISTEN/NOTIFY 커넥션이 끊겼을 때 재접속 대기 (1초부터 2배씩, 최대 값까지)
+WS_PG_RECONNECT_MAX = float(os.getenv("WS_PG_RECONNECT_MAX", "30"))
+
+
+class InProcessBackplane:
+    """기본 백플레인: 같은 프로세스 안의 소켓에만 전달."""
+
+    def __init__(self):
+        self._deliver: Optional[DeliverFn] = None
+
+    def attach(
+        self,
+        deliver: DeliverFn,
+        resync: Optional[ResyncFn] = None,
+        control: Optional[ControlFn] = None,
+    ) -> None:
+        self._deliver = deliver
+
+    def set_loader(self, load: LoadFn) -> None:
+        pass
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, room_id: int, message: str, seq: Optional[int] = None) -> None:
+        await self._deliver(room_id, message, seq)
+
+    async def publish_control(self, room_id: int, data: str) -> None:
+        pass  # 다른 워커 없음 (로컬 처리는 호출한 쪽에서 이미 함)
+
+
+class PostgresBackplane:
+    """
+    Postgres LISTEN/NOTIFY 백플레인.
+    - publish 한 워커는 자기 로컬 소켓에 바로 전달하고, NOTIFY 로 다른 워커에 알린다.
+    - 자기 자신이 보낸 NOTIFY 는 origin 값으로 걸러서 중복 전달을 막는다.
+    - LISTEN 커넥션은 이벤트 루프 add_reader 로 감시 (별도 스레드 없음)
+    - NOTIFY 는 단일 스레드 executor 에서 보내서 이벤트 루프를 막지 않고 순서도 유지
+    - NOTIFY 한도를 넘는 메시지는 (room_id, seq) 만 보내고, 받는 워커가 DB 에서 다시 읽어서 전달
+      (같은 방의 뒤 메시지는 그 전달이 끝날 때까지 기다림 → 받는 워커에서도 방별 순서 유지)
+    - LISTEN 커넥션이 끊기면 backoff 로 재접속 + 다시 LISTEN 하고 resync 콜백 호출
+    - NOTIFY 커넥션이 끊기면 다음 publish 때 새로 연결 (DB 다운 중에는 backoff 동안 로컬 전달만)
+    - 캐시 무효화 같은 제어 이벤트는 seq 자리에 "c" 를 넣어서 같은 채널로 보냄
+    """
+
+    def __init__(self, engine, channel: str = WS_PG_CHANNEL):
+        self.engine = engine
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self._deliver: Optional[DeliverFn] = None
+        self._load: Optional[LoadFn] = None
+        self._resync: Optional[ResyncFn] = None
+        self._control: Optional[ControlFn] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listen_conn = None
+        self._listen_fd: Optional[int] = None
+        self._notify_conn = None
+        self._notify_retry_at = 0.0
+        self._notify_backoff = 0.0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # _on_notify 에서 만든 전달/재접속 태스크 참조 보관 (GC 방지)
+        self._tasks: set[asyncio.Task] = set()
+        # room_id -> 그 방의 마지막 전달 태스크 (DB 로 읽어오는 큰 메시지 뒤로 같은 방 메시지를 줄 세움)
+        self._room_tail: dict[int, asyncio.Task] = {}
+        self._closing = False
+
+    def attach(
+        self,
+        deliver: DeliverFn,
+        resync: Optional[ResyncFn] = None,
+        control: Optional[ControlFn] = None,
+    ) -> None:
+        self._deliver = deliver
+        self._resync = resync
+        self._control = control
+
+    def set_loader(self, load: LoadFn) -> None:
+        self._load = load
+
+    def _connect(self):
+        # 엔진 설정(URL/접속 옵션)을 그대로 쓰되, 풀에서 떼어내서 전용 커넥션으로 사용
+        raw = self.engine.raw_connection()
+        raw.detach()
+        conn = raw.driver_connection
+        conn.autocommit = True
+        return conn
+
+    def _listen(self):
+        conn = self._connect()
+        with conn.cursor() as cur:
+            cur.execute(f'LISTEN "{self.channel}"')
+        return conn
+
+    def _watch(self, conn) -> None:
+        self._listen_conn = conn
+        self._listen_fd = conn.fileno()
+        self._loop.add_reader(self._listen_fd, self._on_notify)
+
+    def _unwatch(self) -> None:
+        conn, fd = self._listen_conn, self._listen_fd
+        self._listen_conn = None
+        self._listen_fd = None
+        if fd is not None:
+            self._loop.remove_reader(fd)
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = self._loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _deliver_in_order(self, room_id: int, fn, *args) -> None:
+        """
+        같은 방 전달은 NOTIFY 순서대로. 앞선 전달(특히 DB 에서 읽는 큰 메시지)이 끝난 뒤에 실행.
+        앞에 밀린 게 없으면 태스크 하나 만들고 바로 전달.
+        """
+        prev = self._room_tail.get(room_id)
+        task = self._spawn(self._after(prev, fn, *args))
+        self._room_tail[room_id] = task
+
+        def _done(t: asyncio.Task) -> None:
+            if self._room_tail.get(room_id) is t:
+                del self._room_tail[room_id]
+
+        task.add_done_callback(_done)
+
+    @staticmethod
+    async def _after(prev: Optional[asyncio.Task], fn, *args) -> None:
+        if prev is not None and not prev.done():
+            await asyncio.wait((prev,))
+        await fn(*args)
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ws-notify")
+        self._closing = False
+
+        self._watch(self._listen())
+        self._notify_conn = self._connect()
+        print(f"[WS] postgres backplane listening on '{self.channel}' (origin={self.origin[:8]})")
+
+    async def stop(self) -> None:
+        self._closing = True
+        if self._loop:
+            self._unwatch()
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._room_tail.clear()
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._notify_conn is not None:
+            try:
+                self._notify_conn.close()
+            except Exception:
+                pass
+        self._notify_conn = None
+
+    async def _relisten(self) -> None:
+        """LISTEN 커넥션 재접속 (1s, 2s, 4s ... WS_PG_RECONNECT_MAX)"""
+        delay = 1.0
+        while not self._closing:
+            await asyncio.sleep(delay)
+            try:
+                # 재접속은 기본 executor 에서 → NOTIFY 순서용 단일 스레드를 막지 않음
+                conn = await self._loop.run_in_executor(None, self._listen)
+            except Exception as e:
+                print(f"[WS] backplane LISTEN reconnect failed, retry in {min(delay * 2, WS_PG_RECONNECT_MAX):.0f}s: {e}")
+                delay = min(delay * 2, WS_PG_RECONNECT_MAX)
+                continue
+            if self._closing:
+                conn.close()
+                return
+            self._watch(conn)
+            print(f"[WS] backplane LISTEN reconnected on '{self.channel}'")
+            # 끊긴 동안 다른 워커가 보낸 알림은 사라졌음 → 캐시/소켓 쪽에서 다시 맞추도록
+            if self._resync is not None:
+                try:
+                    self._resync()
+                except Exception as e:
+                    print(f"[WS] backplane resync error: {e}")
+            return
+
+    def _on_notify(self) -> None:
+        conn = self._listen_conn
+        if conn is None:
+            return
+        try:
+            conn.poll()
+        except Exception as e:
+            # 끊긴 커넥션은 계속 readable 로 잡혀서 여기서 돌게 됨 → reader 떼고 재접속
+            print(f"[WS] backplane LISTEN connection lost: {e}")
+            self._unwatch()
+            self._spawn(self._relisten())
+            return
+
+        while conn.notifies:
+            n = conn.notifies.pop(0)
+            # "<origin>:<room_id>:<seq>:<message>" 형태, message 는 이미 인코딩된 JSON 그대로
+            origin, _, rest = n.payload.partition(":")
+            # 내가 보낸 건 publish 시점에 이미 로컬 전달함
+            if origin == self.origin:
+                continue
+            room_id, _, rest = rest.partition(":")
+            seq, _, message = rest.partition(":")
+            if seq == "c":
+                # "<origin>:<room_id>:c:<json>" 제어 이벤트 (캐시 무효화 등)
+                if self._control is not None and room_id.isdigit():
+                    try:
+                        self._control(int(room_id), message)
+                    except Exception as e:
+                        print(f"[WS] backplane control error: {e}")
+                continue
+            try:
+                room_id = int(room_id)
+                seq = int(seq) if seq else None
+            except ValueError:
+                continue
+            if not message and seq is not None:
+                # NOTIFY 한도를 넘어서 id 만 온 메시지
+                self._deliver_in_order(room_id, self._deliver_loaded, room_id, seq)
+            else:
+                self._deliver_in_order(room_id, self._deliver, room_id, message, seq)
+
+    async def _deliver_loaded(self, room_id: int, seq: int) -> None:
+        if self._load is None:
+            return
+        try:
+            message = await self._loop.run_in_executor(None, self._load, room_id, seq)
+        except Exception as e:
+            print(f"[WS] backplane load error (room {room_id}, message {seq}): {e}")
+            return
+        if message is not None:
+            await self._deliver(room_id, message, seq)
+
+    def _notify(self, payload: str) -> None:
+        # 끊긴 커넥션이면 한 번 새로 연결해서 다시 보냄
+        for attempt in range(2):
+            if self._notify_conn is None:
+                if time.monotonic() < self._notify_retry_at:
+                    raise ConnectionError("notify connection down")
+                try:
+                    self._notify_conn = self._connect()
+                except Exception:
+                    self._notify_backoff = min(max(self._notify_backoff * 2, 1.0), WS_PG_RECONNECT_MAX)
+                    self._notify_retry_at = time.monotonic() + self._notify_backoff
+                    raise
+                self._notify_backoff = 0.0
+            conn = self._notify_conn
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT pg_notify(%s, %s)", (self.channel, payload))
+                return
+            except Exception:
+                if not conn.closed:
+                    raise
+                self._notify_conn = None
+                if attempt:
+                    raise
+
+    async def publish(self, room_id: int, message: str, seq: Optional[int] = None) -> None:
+        await self._deliver(room_id, message, seq)
+
+        # 다시 JSON 으로 감싸지 않고 인코딩된 메시지를 그대로 실어 보냄
+        payload = f"{self.origin}:{room_id}:{'' if seq is None else seq}:{message}"
+        if len(payload.encode("utf-8")) > PG_NOTIFY_MAX_BYTES:
+            if seq is None:
+                # 저장 안 된 이벤트는 다시 읽어올 데가 없음 → 이 워커의 소켓에만 전달됨
+                print(f"[WS] backplane event too large for NOTIFY (room {room_id}), local only")
+                return
+            # 저장된 메시지는 id 만 보내고 받는 쪽에서 DB 로 읽음
+            payload = f"{self.origin}:{room_id}:{seq}:"
+
+        try:
+            await self._loop.run_in_executor(self._executor, self._notify, payload)
+        except Exception as e:
+            print(f"[WS] backplane notify error: {e}")
+
+    async def publish_control(self, room_id: int, data: str) -> None:
+        """다른 워커에만 제어 이벤트 전달 (자기 워커 처리는 호출한 쪽에서 이미 함)"""
+        payload = f"{self.origin}:{room_id}:c:{data}"
+        if len(payload.encode("utf-8")) > PG_NOTIFY_MAX_BYTES:
+            print(f"[WS] backplane control event too large for NOTIFY (room {room_id}), dropped")
+            return
+        try:
+            await self._loop.run_in_executor(self._executor, self._notify, payload)
+        except Exception as e:
+            print(f"[WS] backplane notify error: {e}")
+
+
+def create_backplane(kind: str = WS_BACKPLANE):
+    if kind in ("", "memory"):
+        return InProcessBackplane()
+    if kind == "postgres":
+        from app.database import engine
+
+        if engine.dialect.name != "postgresql":
+            raise RuntimeError("WS_BACKPLANE=postgres requires a PostgreSQL DATABASE_URL")
+        return PostgresBackplane(engine)
+    raise RuntimeError(f"Unknown WS_BACKPLANE: {kind}")
@@ -0,0 +1,61 @@
+# app/websocket/codec.py
+"""
+채팅 payload 직렬화.
+broadcast 마다 한 번만 인코딩하고, 같은 문자열을 방의 모든 소켓에 그대로 보낸다.
+orjson 이 설치되어 있으면 사용하고, 없으면 표준 json 으로 동작한다.
+
+프레임 형식 (접속 시 ?format= 으로 선택)
+- json    : 텍스트 프레임 (기본)
+- msgpack : 바이너리 프레임, msgpack 패키지가 설치된 경우에만 (없으면 json 으로 동작)
+백플레인/리스너에는 항상 JSON 텍스트가 흐르고, 소켓으로 보내기 직전에 형식별로 한 번씩만 변환한다.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # 선택 의존성
+    msgpack = None
+
+
+def dumps(message: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(message).decode("utf-8")
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def loads(data: str | bytes) -> dict:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def negotiate(requested: str | None) -> str:
+    """클라이언트가 요청한 형식 중 서버가 지원하는 것 (모르면 json)"""
+    if (requested or "").lower() == "msgpack" and msgpack is not None:
+        return "msgpack"
+    return "json"
+
+
+def encode(message: dict, fmt: str = "json") -> str | bytes:
+    if fmt == "msgpack":
+        return msgpack.packb(message, use_bin_type=True)
+    return dumps(message)
+
+
+def transcode(data: str, fmt: str) -> str | bytes:
+    """이미 인코딩된 JSON 텍스트를 다른 형식으로 (json 이면 그대로)"""
+    if fmt == "json":
+        return data
+    return encode(loads(data), fmt)
+
+
+def decode(data: str | bytes) -> dict:
+    """클라이언트 프레임 → dict. 바이너리는 msgpack, 텍스트는 JSON 으로 본다."""
+    if isinstance(data, bytes) and msgpack is not None:
+        return msgpack.unpackb(data, raw=False)
+    return loads(data)
@@ -1,41 +1,179 @@
 # app/websocket/endpoints.py
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-from sqlalchemy.orm import Session
+import hmac
+import os
 
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, WebSocketException, Depends, Header, HTTPException, status
+from starlette.concurrency import run_in_threadpool
+
+from app.database import SessionLocal
+from app.websocket import codec
 from app.websocket.manager import manager
-from app.database import get_db
-from app.models.message import Message
-from app.models.user import User
+from app.websocket.history_cache import history_cache
+from app.websocket.ephemeral import ephemeral_hub, CLIENT_EVENT_TYPES
+from app.websocket.membership import membership_index
+from app.utils.user_cache import CachedUser
+from app.schemas.message import MessageOut
+from app.services.message_service import get_message, list_messages, save_message
 from app.deps.auth_ws import get_current_user_ws  # 🔥 추가
 
 router = APIRouter()
 
+# 재접속 시 한 번에 replay 해주는 최대 메시지 수 (넘으면 클라이언트가 HTTP 로 다시 불러오도록 안내)
+WS_REPLAY_MAX = int(os.getenv("WS_REPLAY_MAX", "1000"))
+_REPLAY_PAGE = 200
+# /api/v1/ws/stats 접근 토큰 (비어 있으면 엔드포인트 비활성화)
+WS_STATS_TOKEN = os.getenv("WS_STATS_TOKEN", "")
+
+# 저장된 메시지가 브로드캐스트될 때(다른 워커 포함) 방별 최근 메시지 캐시도 갱신
+manager.add_listener(history_cache.on_broadcast)
+# 백플레인이 끊겼던 동안의 메시지는 캐시에 없을 수 있음 → 비우고 DB 에서 다시 채움
+manager.add_resync_listener(history_cache.clear)
+# 다른 워커에서 보낸 캐시 무효화 (manager.signal)
+manager.add_control_listener("history_invalidate", lambda room_id, event: history_cache.invalidate(room_id))
+manager.add_control_listener("membership_invalidate", lambda room_id, event: membership_index.invalidate(room_id))
+manager.add_control_listener(
+    "membership_remove", lambda room_id, event: membership_index.remove(room_id, event["user_id"])
+)
+
+
+def _load_broadcast(room_id: int, message_id: int) -> str | None:
+    """NOTIFY 한도를 넘어 id 만 전달된 메시지 → DB 에서 브로드캐스트 payload 다시 만듦 (백플레인 스레드에서 호출)"""
+    db = SessionLocal()
+    try:
+        msg = get_message(db, room_id, message_id)
+    finally:
+        db.close()
+    if msg is None:
+        return None
+    return codec.dumps(
+        {
+            "id": msg.id,
+            "room_id": msg.room_id,
+            "user_id": msg.user_id,
+            "nickname": msg.user_nickname,
+            "content": msg.content,
+            "created_at": msg.created_at.isoformat(),
+        }
+    )
+
+
+manager.backplane.set_loader(_load_broadcast)
+
+
+def _load_missed(room_id: int, last_seen_id: int) -> tuple[list[MessageOut], bool]:
+    """last_seen_id 이후 메시지 (캐시 → 없으면 DB). 반환: (메시지들, 잘렸는지)"""
+    db = SessionLocal()
+    try:
+        missed: list[MessageOut] = []
+        cursor = last_seen_id
+        while len(missed) < WS_REPLAY_MAX:
+            page = list_messages(db, room_id, limit=_REPLAY_PAGE, after_id=cursor)
+            missed.extend(page)
+            if len(page) < _REPLAY_PAGE:
+                return missed, False
+            cursor = page[-1].id
+        return missed[:WS_REPLAY_MAX], True
+    finally:
+        db.close()
+
+
+async def _receive(websocket: WebSocket) -> dict:
+    """텍스트(JSON) / 바이너리(msgpack) 프레임 모두 받아서 dict 로"""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    raw = message.get("text")
+    return codec.decode(raw if raw is not None else message.get("bytes"))
+
+
+@router.get("/api/v1/ws/stats", tags=["system"], include_in_schema=False)
+async def ws_stats(x_stats_token: str | None = Header(None)):
+    """
+    이 워커의 실시간 소켓 수(방별/전체)와 히스토리 캐시 사용량 — 용량 산정/모니터링용 (내부 전용)
+    WS_STATS_TOKEN 이 설정된 경우에만 열리고, X-Stats-Token 헤더가 같아야 응답 (없으면 404)
+    """
+    if not WS_STATS_TOKEN or not hmac.compare_digest(x_stats_token or "", WS_STATS_TOKEN):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return {**manager.stats(), "history_cache": history_cache.stats()}
+
+
 @router.websocket("/ws/rooms/{room_id}")
 async def websocket_room(
     websocket: WebSocket,
     room_id: int,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user_ws),  # 🔥 로그인 유저 주입
+    user: CachedUser = Depends(get_current_user_ws),  # 🔥 로그인 유저 주입 (캐시된 스냅샷)
 ):
-    await manager.connect(room_id, websocket)
+    # 재접속: ?last_seen_id=<마지막으로 받은 메시지 id>
+    try:
+        last_seen_id = int(websocket.query_params.get("last_seen_id") or 0) or None
+    except ValueError:
+        last_seen_id = None
+
+    # 🔒 방 멤버만 입장 (멤버십 인덱스: 보통은 메모리 set 조회, 처음/만료 시에만 DB)
+    if not await run_in_threadpool(membership_index.check, room_id, user.id):
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION)
+
+    # 프레임 형식: ?format=msgpack (모바일 등 바이트 절약용, 서버에 msgpack 없으면 json)
+    fmt = codec.negotiate(websocket.query_params.get("format"))
+
+    # 앱 하트비트: ?heartbeat=1 이면 서버 ping 에 pong 으로 답하는 클라이언트 (조용하면 정리됨)
+    heartbeat = websocket.query_params.get("heartbeat", "").lower() in ("1", "true", "yes")
+
+    # replay 하는 동안 들어오는 라이브 메시지는 큐에 쌓아두고 보류
+    await manager.connect(room_id, websocket, hold=last_seen_id is not None, fmt=fmt, heartbeat=heartbeat)
+    presence_session = ephemeral_hub.joined(room_id, user.id, user.nickname)
+    # 지금 방에 있는 접속 목록을 라이브 이벤트보다 먼저 (같은 송신 큐로)
+    manager.send(room_id, websocket, ephemeral_hub.snapshot(room_id))
 
     try:
+        if last_seen_id is not None:
+            missed, truncated = await run_in_threadpool(_load_missed, room_id, last_seen_id)
+            send = websocket.send_bytes if fmt == "msgpack" else websocket.send_text
+            for m in missed:
+                await send(codec.encode({
+                    "id": m.id,
+                    "room_id": room_id,
+                    "user_id": m.user_id,
+                    "nickname": m.user_nickname,
+                    "content": m.content,
+                    "created_at": m.created_at.isoformat(),
+                }, fmt))
+            last_sent_id = missed[-1].id if missed else last_seen_id
+            await send(codec.encode({
+                "type": "replay_done",
+                "last_id": last_sent_id,
+                # True 면 빠진 게 너무 많아서 일부만 보냄 → HTTP 로 히스토리 다시 불러오기
+                "truncated": truncated,
+            }, fmt))
+            # replay 로 보낸 id 만 건너뛰고 라이브 전송 시작 → 빈틈/중복 없이 이어짐
+            # (다른 워커에서 늦게 커밋된 last_sent_id 이하 메시지는 라이브로 그대로 전달)
+            manager.release(room_id, websocket, (m.id for m in missed))
+
         while True:
-            data = await websocket.receive_json()
+            data = await _receive(websocket)
+            manager.touch(room_id, websocket)  # pong 포함 아무 프레임이나 → 살아있음
+
+            # 타이핑/읽음 같은 휘발성 이벤트: 저장 안 하고 모아서 전송
+            if data.get("type") in CLIENT_EVENT_TYPES:
+                ephemeral_hub.submit(room_id, user.id, user.nickname, data)
+                continue
+
             content = data.get("content")
 
             if not content:
                 continue
 
-            # 🔹 이제 user_id를 실제 유저로 세팅
-            msg = Message(
-                room_id=room_id,
-                user_id=user.id,
-                content=content,
-            )
-            db.add(msg)
-            db.commit()
-            db.refresh(msg)
+            # 방에서 나간 유저는 연결 끊기 (캐시로 판단 못 할 때만 DB 재확인)
+            is_member = membership_index.is_member_cached(room_id, user.id)
+            if is_member is None:
+                is_member = await run_in_threadpool(membership_index.check, room_id, user.id)
+            if not is_member:
+                manager.disconnect(room_id, websocket)
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+                return
+
+            # 🔹 DB 저장은 전용 스레드에서 (커밋 기다리는 동안에도 이벤트 루프는 다른 소켓 처리)
+            msg = await save_message(room_id, user.id, content)
 
             payload = {
                 "id": msg.id,
@@ -46,7 +184,7 @@ async def websocket_room(
                 "created_at": msg.created_at.isoformat(),
             }
 
-            await manager.broadcast(room_id, payload)
+            await manager.broadcast(room_id, payload, seq=msg.id)
 
     except WebSocketDisconnect:
         manager.disconnect(room_id, websocket)
@@ -57,3 +195,5 @@ async def websocket_room(
             await websocket.close(code=1011)
         except Exception:
             pass
+    finally:
+        ephemeral_hub.left(room_id, user.id, user.nickname, presence_session)
@@ -0,0 +1,166 @@
+# app/websocket/ephemeral.py
+"""
+저장하지 않는 실시간 이벤트 (타이핑 / 온라인·오프라인 / 읽음 표시).
+
+- DB, 히스토리 캐시에 남기지 않음 (seq=None 으로 브로드캐스트)
+- 유저별 토큰 버킷으로 초당 전송 수 제한 → 키 입력마다 보내는 클라이언트도 안전
+- 방별로 EPHEMERAL_COALESCE_MS 동안 모아서 한 프레임으로 전송
+  같은 (유저, 이벤트 종류)는 마지막 것만 남김 → 타이핑 on/off 를 여러 번 해도 1개
+  전송 형태: {"type": "events", "room_id": 1, "events": [{...}, {...}]}
+- presence 는 소켓(접속) 단위: {"type": "presence", "user_id", "nickname", "status", "session"}
+  워커가 여러 개면 한 워커가 유저의 전체 접속을 알 수 없으므로 서버는 접속마다 online/offline 만 알리고,
+  클라이언트가 (user_id, session) 으로 모아서 online 인 session 이 하나라도 있으면 온라인으로 표시한다.
+  (session 이 모두 offline 이 되면 그 유저의 타이핑 표시도 클라이언트에서 지움)
+- 접속 직후 그 소켓에만 현재 상태를 한 번 보냄 (이후는 위의 online/offline 변화분):
+  {"type": "presence_snapshot", "room_id": 1, "sessions": [{"user_id", "nickname", "session"}, ...]}
+  ⚠️ 스냅샷은 이 소켓이 붙은 워커의 접속만 담는다. 다른 워커에 붙은 접속은 그쪽에서 새로 접속/종료할 때
+  변화분으로만 보이므로, 워커가 여러 개면 스냅샷 직후의 온라인 목록은 일부일 수 있음
+"""
+import asyncio
+import os
+import time
+import uuid
+
+from app.websocket.manager import manager
+
+EPHEMERAL_COALESCE_MS = float(os.getenv("EPHEMERAL_COALESCE_MS", "150"))
+EPHEMERAL_RATE_PER_SEC = float(os.getenv("EPHEMERAL_RATE_PER_SEC", "5"))
+EPHEMERAL_BURST = float(os.getenv("EPHEMERAL_BURST", "10"))
+
+# 클라이언트가 보낼 수 있는 이벤트 종류 (presence 는 서버가 접속/종료 때 직접 만듦)
+CLIENT_EVENT_TYPES = {"typing", "read"}
+
+
+class _TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self):
+        self.tokens = EPHEMERAL_BURST
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(EPHEMERAL_BURST, self.tokens + (now - self.updated) * EPHEMERAL_RATE_PER_SEC)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class EphemeralHub:
+    def __init__(self, manager, window_ms: float = EPHEMERAL_COALESCE_MS):
+        self.manager = manager
+        self.window = max(window_ms, 0) / 1000
+        # room_id -> {(user_id, type, session): event}
+        self._pending: dict[int, dict[tuple[int, str, str | None], dict]] = {}
+        # (user_id, 이벤트 종류) -> 버킷 (타이핑 연타가 읽음 표시를 막지 않도록 종류별로)
+        self._buckets: dict[tuple[int, str], _TokenBucket] = {}
+        # room_id -> {user_id: 이 워커에 열린 소켓 수} (버킷/타이핑 정리용)
+        self._online: dict[int, dict[int, int]] = {}
+        # room_id -> {session: (user_id, nickname)} (접속 직후 스냅샷용)
+        self._sessions: dict[int, dict[str, tuple[int, str | None]]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    # ── 클라이언트 이벤트 ─────────────────────────────────
+    def submit(self, room_id: int, user_id: int, nickname: str | None, data: dict) -> bool:
+        """클라이언트가 보낸 이벤트. 형식이 틀리거나 한도 초과면 조용히 버리고 False."""
+        etype = data.get("type")
+        if etype == "typing":
+            event = {"type": "typing", "user_id": user_id, "nickname": nickname, "typing": bool(data.get("typing", True))}
+        elif etype == "read":
+            last_read_id = data.get("last_read_id")
+            if not isinstance(last_read_id, int) or last_read_id <= 0:
+                return False
+            event = {"type": "read", "user_id": user_id, "last_read_id": last_read_id}
+        else:
+            return False
+
+        bucket = self._buckets.get((user_id, etype))
+        if bucket is None:
+            bucket = self._buckets[(user_id, etype)] = _TokenBucket()
+        if not bucket.take():
+            return False
+
+        self._add(room_id, user_id, event)
+        return True
+
+    # ── presence (서버가 접속/종료 시 호출) ────────────────
+    def joined(self, room_id: int, user_id: int, nickname: str | None) -> str:
+        """접속마다 호출. 반환한 session 을 종료 때 left 에 그대로 넘길 것."""
+        session = uuid.uuid4().hex
+        self._sessions.setdefault(room_id, {})[session] = (user_id, nickname)
+        users = self._online.setdefault(room_id, {})
+        users[user_id] = users.get(user_id, 0) + 1
+        self._add(
+            room_id,
+            user_id,
+            {"type": "presence", "user_id": user_id, "nickname": nickname, "status": "online", "session": session},
+        )
+        return session
+
+    def left(self, room_id: int, user_id: int, nickname: str | None, session: str) -> None:
+        sessions = self._sessions.get(room_id)
+        if sessions is not None:
+            sessions.pop(session, None)
+            if not sessions:
+                del self._sessions[room_id]
+        users = self._online.get(room_id)
+        if not users or user_id not in users:
+            return
+        self._add(
+            room_id,
+            user_id,
+            {"type": "presence", "user_id": user_id, "nickname": nickname, "status": "offline", "session": session},
+        )
+        users[user_id] -= 1
+        if users[user_id] > 0:
+            return
+        del users[user_id]
+        if not users:
+            del self._online[room_id]
+        if not any(user_id in u for u in self._online.values()):
+            for etype in CLIENT_EVENT_TYPES:
+                self._buckets.pop((user_id, etype), None)
+        # 이 워커의 마지막 접속이 나가면 보내기 전인 타이핑 표시는 버림
+        pending = self._pending.get(room_id)
+        if pending:
+            pending.pop((user_id, "typing", None), None)
+
+    def snapshot(self, room_id: int) -> dict:
+        """이 워커에서 지금 방에 접속해 있는 session 목록 (접속한 소켓에 처음 한 번 보냄)"""
+        sessions = self._sessions.get(room_id, {})
+        return {
+            "type": "presence_snapshot",
+            "room_id": room_id,
+            "sessions": [
+                {"user_id": user_id, "nickname": nickname, "session": session}
+                for session, (user_id, nickname) in sessions.items()
+            ],
+        }
+
+    # ── 내부 ─────────────────────────────────────────────
+    def _add(self, room_id: int, user_id: int, event: dict) -> None:
+        pending = self._pending.get(room_id)
+        if pending is None:
+            pending = self._pending[room_id] = {}
+            task = asyncio.create_task(self._flush_later(room_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        key = (user_id, event["type"], event.get("session"))
+        pending.pop(key, None)  # 최신 것이 뒤로 가도록
+        pending[key] = event
+
+    async def _flush_later(self, room_id: int) -> None:
+        if self.window:
+            await asyncio.sleep(self.window)
+        pending = self._pending.pop(room_id, None)
+        if not pending:
+            return
+        try:
+            await self.manager.broadcast(room_id, {"type": "events", "room_id": room_id, "events": list(pending.values())})
+        except Exception as e:
+            print(f"[WS] ephemeral flush error in room {room_id}: {e}")
+
+
+ephemeral_hub = EphemeralHub(manager)
@@ -0,0 +1,220 @@
+# app/websocket/history_cache.py
+"""
+방별 최근 메시지 hot-tail 캐시 (프로세스 메모리).
+
+- get_messages 가 DB 에서 최신 메시지를 처음 읽을 때 seed → 이후 그 방의 "꼬리"는 완전함
+- 브로드캐스트되는 메시지(다른 워커에서 온 것 포함)는 manager listener 로 append
+  (워커마다 커밋 순서가 달라 id 가 역순으로 올 수 있음 → 정렬된 자리에 끼워 넣음)
+- seed 후 HISTORY_CACHE_TTL 이 지나면 버리고 DB 에서 다시 채움
+  (브로드캐스트를 거치지 않은 DB 변경도 이 시간 안에는 반영됨)
+- 다른 워커의 무효화는 manager.signal(room_id, "history_invalidate") 로 백플레인을 통해 받음
+- 최근 구간 조회는 DB 없이 여기서 바로 응답
+- 오래 안 쓴 방부터 LRU 로 제거, 방 개수/대략적인 메모리 상한 적용
+
+get_messages(동기 라우터 → 스레드풀)와 이벤트 루프 양쪽에서 접근하므로 lock 으로 보호한다.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict, deque
+
+from app.websocket import codec
+
+HISTORY_CACHE_PER_ROOM = int(os.getenv("HISTORY_CACHE_PER_ROOM", "200"))
+HISTORY_CACHE_MAX_ROOMS = int(os.getenv("HISTORY_CACHE_MAX_ROOMS", "5000"))
+HISTORY_CACHE_MAX_BYTES = int(os.getenv("HISTORY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# seed 후 이 시간(초)이 지나면 다시 seed
+HISTORY_CACHE_TTL = float(os.getenv("HISTORY_CACHE_TTL", "60"))
+
+# 메시지 1개당 dict/문자열 오버헤드 대략치
+_ITEM_OVERHEAD = 256
+
+
+def _item_size(item: dict) -> int:
+    return _ITEM_OVERHEAD + len(item.get("content") or "")
+
+
+class _RoomBuffer:
+    __slots__ = ("items", "bytes", "complete", "ready", "seeded_at")
+
+    def __init__(self, maxlen: int):
+        self.items: deque = deque(maxlen=maxlen)
+        self.bytes = 0
+        # complete: 방의 전체 히스토리가 버퍼 안에 다 있음
+        # ready   : seed 완료 (seed 전에는 append 만 모으고 조회에는 안 씀)
+        self.complete = False
+        self.ready = False
+        self.seeded_at = 0.0
+
+
+class RoomHistoryCache:
+    def __init__(
+        self,
+        per_room: int = HISTORY_CACHE_PER_ROOM,
+        max_rooms: int = HISTORY_CACHE_MAX_ROOMS,
+        max_bytes: int = HISTORY_CACHE_MAX_BYTES,
+        ttl: float = HISTORY_CACHE_TTL,
+    ):
+        self.per_room = per_room
+        self.max_rooms = max_rooms
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._rooms: "OrderedDict[int, _RoomBuffer]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    # ── 조회 ─────────────────────────────────────────────
+    def window(
+        self,
+        room_id: int,
+        limit: int,
+        before_id: int | None = None,
+        after_id: int | None = None,
+    ) -> list[dict] | None:
+        """캐시로 정확히 답할 수 있으면 오래된→최신 순 리스트, 아니면 None (DB 로)."""
+        with self._lock:
+            buf = self._rooms.get(room_id)
+            if buf is None or not buf.ready:
+                return None
+            if time.monotonic() - buf.seeded_at > self.ttl:
+                # 오래된 버퍼 → 버리고 이번 조회에서 DB 로 다시 seed
+                del self._rooms[room_id]
+                self._bytes -= buf.bytes
+                return None
+            self._rooms.move_to_end(room_id)
+            items = list(buf.items)
+
+        if after_id is not None:
+            # 버퍼 시작보다 이전 구간이면 그 사이에 빠진 게 있을 수 있음 (id 는 방마다 연속이 아님)
+            if not buf.complete and (not items or after_id < items[0]["id"]):
+                return None
+            return [m for m in items if m["id"] > after_id][:limit]
+
+        if before_id is not None:
+            older = [m for m in items if m["id"] < before_id]
+            if len(older) >= limit:
+                return older[-limit:]
+            # 버퍼에 before_id 가 있고 방 전체가 버퍼에 있을 때만 "더 없음"이 확실
+            if buf.complete and any(m["id"] == before_id for m in items):
+                return older
+            return None
+
+        if len(items) >= limit or buf.complete:
+            return items[-limit:]
+        return None
+
+    # ── 채우기 ───────────────────────────────────────────
+    def begin_seed(self, room_id: int) -> None:
+        """DB 읽기 *전에* 호출 → 읽는 동안 들어온 메시지도 놓치지 않음."""
+        with self._lock:
+            if room_id not in self._rooms:
+                self._rooms[room_id] = _RoomBuffer(self.per_room)
+                self._evict()
+
+    def seed(self, room_id: int, items: list[dict], complete: bool) -> None:
+        """DB 에서 읽은 최신 메시지(오래된→최신 순)로 버퍼 확정."""
+        with self._lock:
+            buf = self._rooms.get(room_id)
+            if buf is None:
+                return  # 그새 LRU 로 밀려남
+            if buf.ready:
+                return
+            merged = {m["id"]: m for m in items}
+            for m in buf.items:  # DB 읽는 사이 append 된 것
+                merged.setdefault(m["id"], m)
+            ordered = [merged[k] for k in sorted(merged)]
+            self._reset(buf, ordered)
+            buf.complete = complete and len(ordered) <= self.per_room
+            buf.ready = True
+            buf.seeded_at = time.monotonic()
+            self._rooms.move_to_end(room_id)
+            self._evict()
+
+    def append(self, room_id: int, item: dict) -> None:
+        with self._lock:
+            buf = self._rooms.get(room_id)
+            if buf is None:
+                return  # seed 안 된 방은 꼬리가 완전하다는 보장이 없음
+            items = buf.items
+            msg_id = item["id"]
+            if not items or msg_id > items[-1]["id"]:
+                pos = len(items)
+            else:
+                # 다른 워커에서 늦게 커밋된 메시지 → id 순서 자리에 끼워 넣음
+                pos = bisect_left([m["id"] for m in items], msg_id)
+                if pos < len(items) and items[pos]["id"] == msg_id:
+                    return  # 중복
+                if pos == 0 and not buf.complete:
+                    return  # 버퍼 시작보다 이전 → 버퍼 밖 구간 (DB 에서 읽음)
+            if len(items) == items.maxlen:
+                if pos == 0:
+                    # 가득 찬 버퍼의 맨 앞보다 오래됨 → 들어갈 자리 없음 (버퍼 밖에 메시지가 생김)
+                    buf.complete = False
+                    return
+                self._drop_size(buf, _item_size(items.popleft()))
+                buf.complete = False
+                pos -= 1
+            items.insert(pos, item)
+            size = _item_size(item)
+            buf.bytes += size
+            self._bytes += size
+            self._evict()
+
+    def invalidate(self, room_id: int) -> None:
+        with self._lock:
+            buf = self._rooms.pop(room_id, None)
+            if buf is not None:
+                self._bytes -= buf.bytes
+
+    def clear(self) -> None:
+        """전체 비우기 (백플레인 재접속 등으로 브로드캐스트를 놓쳤을 수 있을 때)"""
+        with self._lock:
+            self._rooms.clear()
+            self._bytes = 0
+
+    def on_broadcast(self, room_id: int, data: str) -> None:
+        """ConnectionManager listener: 캐시 중인 방의 채팅 메시지만 디코딩해서 추가."""
+        if room_id not in self._rooms:
+            return
+        try:
+            payload = codec.loads(data)
+        except ValueError:
+            return
+        if not isinstance(payload, dict) or "id" not in payload or "content" not in payload:
+            return
+        self.append(
+            room_id,
+            {
+                "id": payload["id"],
+                "room_id": room_id,
+                "user_id": payload.get("user_id"),
+                "content": payload["content"],
+                "created_at": payload.get("created_at"),
+                "user_nickname": payload.get("nickname"),
+            },
+        )
+
+    # ── 내부 ─────────────────────────────────────────────
+    def _reset(self, buf: _RoomBuffer, items: list[dict]) -> None:
+        self._bytes -= buf.bytes
+        buf.items.clear()
+        buf.items.extend(items)
+        buf.bytes = sum(_item_size(m) for m in buf.items)
+        self._bytes += buf.bytes
+
+    def _drop_size(self, buf: _RoomBuffer, size: int) -> None:
+        buf.bytes -= size
+        self._bytes -= size
+
+    def _evict(self) -> None:
+        while self._rooms and (len(self._rooms) > self.max_rooms or self._bytes > self.max_bytes):
+            _, buf = self._rooms.popitem(last=False)
+            self._bytes -= buf.bytes
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"rooms": len(self._rooms), "bytes": self._bytes}
+
+
+history_cache = RoomHistoryCache()
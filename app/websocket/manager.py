@@ -1,36 +1,361 @@
 # app/websocket/manager.py
-from typing import Dict, List
-from fastapi import WebSocket
+import asyncio
+import os
+import time
+from typing import Callable, Dict, Iterable, List
+from fastapi import WebSocket, status
+
+from app.websocket import codec
+from app.websocket.backplane import create_backplane
+
+# 소켓별 송신 큐 크기 / 한 번 send 제한 시간(초)
+WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+WS_SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT", "5"))
+# 큐가 가득 찬 느린 클라이언트 처리: disconnect(끊기) | drop_oldest(오래된 것 버리기)
+WS_SLOW_CONSUMER_POLICY = os.getenv("WS_SLOW_CONSUMER_POLICY", "disconnect").strip().lower()
+# 앱 하트비트 (?heartbeat=1 로 접속한 클라이언트만): PING_INTERVAL 마다 {"type":"ping"} 전송,
+# IDLE_TIMEOUT 동안 클라이언트에서 아무것도 안 오면 정리
+# (클라이언트는 ping 에 {"type":"pong"} 으로 답하면 됨 — 어떤 프레임이든 받으면 살아있는 걸로 봄)
+# 하트비트를 안 켠 클라이언트(읽기만 하는 클라이언트, 기존 앱)는 조용해도 끊지 않음.
+# half-open TCP 는 uvicorn 의 프로토콜 ping(--ws-ping-interval / --ws-ping-timeout)이 잡는다.
+# 대신 송신 큐가 IDLE_TIMEOUT 넘게 전혀 안 빠지는 소켓은 하트비트 여부와 상관없이 정리.
+WS_PING_INTERVAL = float(os.getenv("WS_PING_INTERVAL", "20"))
+WS_IDLE_TIMEOUT = float(os.getenv("WS_IDLE_TIMEOUT", "60"))
+
+_PING = codec.dumps({"type": "ping"})
+
+
+class Peer:
+    """
+    소켓 하나 + 전용 송신 큐 + writer 태스크.
+    broadcast 는 (이미 인코딩된) 텍스트를 큐에 넣기만 하고, 실제 send 는 writer 가 소켓마다 따로 처리한다.
+    → 느린 클라이언트 하나가 방 전체/보낸 사람의 receive 루프를 막지 않음
+    """
+
+    def __init__(
+        self,
+        manager: "ConnectionManager",
+        room_id: int,
+        websocket: WebSocket,
+        fmt: str = "json",
+        heartbeat: bool = False,
+    ):
+        self.manager = manager
+        self.room_id = room_id
+        self.websocket = websocket
+        # 프레임 형식: json(텍스트) | msgpack(바이너리)
+        self.format = fmt
+        # (seq, 인코딩된 프레임) — seq 는 채팅 메시지 id (이벤트류는 None)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=WS_SEND_QUEUE_SIZE)
+        self.task: asyncio.Task | None = None
+        self.closed = False
+        # 재접속 replay 로 이미 보낸 메시지 id 들 → 큐에서 같은 seq 는 건너뜀
+        # (워커마다 커밋 순서가 달라서 replay 마지막 id 보다 작은 메시지가 늦게 올 수 있음 → id 범위로 자르지 않음)
+        self.skip_ids: frozenset[int] = frozenset()
+        # 앱 하트비트(ping/pong)에 참여하는 클라이언트인지
+        self.heartbeat = heartbeat
+        # 클라이언트에서 마지막으로 프레임을 받은 시각 (하트비트 idle 정리용)
+        self.last_seen = time.monotonic()
+        # 송신 큐가 마지막으로 움직인 시각: writer 가 프레임을 꺼냈거나 빈 큐에 프레임이 들어온 때
+        # (송신 큐 막힘 판단용 — 조용한 방에서 send 가 진행 중인 소켓을 막힌 걸로 보지 않도록)
+        self.last_progress = time.monotonic()
+
+    def start(self):
+        self.last_progress = time.monotonic()
+        self.task = asyncio.create_task(self._writer())
+
+    def enqueue(self, message: str | bytes, seq: int | None = None) -> bool:
+        """큐에 넣기. False면 느린 클라이언트로 보고 끊어야 함."""
+        if self.closed:
+            return True
+        try:
+            if self.queue.empty():
+                self.last_progress = time.monotonic()
+            self.queue.put_nowait((seq, message))
+            return True
+        except asyncio.QueueFull:
+            if WS_SLOW_CONSUMER_POLICY == "drop_oldest":
+                self.queue.get_nowait()
+                self.queue.put_nowait((seq, message))
+                return True
+            return False
+
+    async def _writer(self):
+        ws = self.websocket
+        while True:
+            seq, message = await self.queue.get()
+            self.last_progress = time.monotonic()
+            if seq is not None and seq in self.skip_ids:
+                continue  # replay 로 이미 보낸 메시지
+            try:
+                async with asyncio.timeout(WS_SEND_TIMEOUT):
+                    if isinstance(message, bytes):
+                        await ws.send_bytes(message)
+                    else:
+                        await ws.send_text(message)
+            except asyncio.TimeoutError:
+                print(f"[WS] send timeout in room {self.room_id}, dropping client")
+                self.manager.kick(self.room_id, ws, code=status.WS_1013_TRY_AGAIN_LATER)
+                return
+            except Exception as e:
+                print(f"[WS] broadcast error: {e}")
+                self.manager.disconnect(self.room_id, ws)
+                return
+
+    def close(self):
+        self.closed = True
+        task = self.task
+        if task and not task.done() and task is not asyncio.current_task():
+            task.cancel()
+
 
 class ConnectionManager:
-    def __init__(self):
-        # room_id -> [WebSocket, WebSocket, ...]
-        self.active_connections: Dict[int, List[WebSocket]] = {}
+    def __init__(self, backplane=None):
+        # room_id -> {WebSocket: Peer}  (이 프로세스에 붙은 소켓만)
+        self.active_connections: Dict[int, Dict[WebSocket, Peer]] = {}
+        # close 등 fire-and-forget 태스크 참조 보관 (GC 방지)
+        self._bg_tasks: set[asyncio.Task] = set()
+        # 이 워커에 도착한 모든 브로드캐스트를 받아보는 콜백 (room_id, 인코딩된 텍스트)
+        self._listeners: List[Callable[[int, str], None]] = []
+        # 백플레인이 끊겼다 다시 붙었을 때 호출 (캐시 비우기 등)
+        self._resync_listeners: List[Callable[[], None]] = []
+        # 제어 이벤트 op -> 콜백 (room_id, event dict). 소켓으로는 안 가고 모든 워커에서 실행됨
+        self._control_listeners: Dict[str, List[Callable[[int, dict], None]]] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._reaper_task: asyncio.Task | None = None
+        # 누적 카운터 (stats 용)
+        self.counters = {"connected": 0, "disconnected": 0, "kicked": 0, "reaped": 0}
+
+        # 워커 간 fan-out 담당 (기본: 프로세스 내부)
+        self.backplane = backplane or create_backplane()
+        self.backplane.attach(self._deliver_local, self._resync, self._on_control)
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        await self.backplane.start()
+        if self._reaper_task is None and WS_PING_INTERVAL > 0:
+            self._reaper_task = asyncio.create_task(self._reaper())
 
-    async def connect(self, room_id: int, websocket: WebSocket):
+    async def stop(self):
+        if self._reaper_task is not None:
+            self._reaper_task.cancel()
+            try:
+                await self._reaper_task
+            except asyncio.CancelledError:
+                pass
+            self._reaper_task = None
+        await self.backplane.stop()
+        self._loop = None
+
+    async def connect(
+        self,
+        room_id: int,
+        websocket: WebSocket,
+        hold: bool = False,
+        fmt: str = "json",
+        heartbeat: bool = False,
+    ):
+        """
+        hold=True 면 방에 등록(라이브 메시지는 큐에 쌓임)만 하고 송신은 release() 때까지 보류.
+        재접속 replay 를 먼저 보내고 라이브로 넘어갈 때 빈틈/중복 없이 이어붙이기 위함.
+        fmt: 이 소켓으로 보낼 프레임 형식 (codec.negotiate 결과)
+        heartbeat: 앱 ping/pong 에 참여 (조용하면 IDLE_TIMEOUT 뒤 정리)
+        """
         # 연결 수락
         await websocket.accept()
-        self.active_connections.setdefault(room_id, []).append(websocket)
+        peer = Peer(self, room_id, websocket, fmt, heartbeat)
+        self.active_connections.setdefault(room_id, {})[websocket] = peer
+        if not hold:
+            peer.start()
+        self.counters["connected"] += 1
         print(f"[WS] Connected to room {room_id}. Now {len(self.active_connections[room_id])} clients.")
 
+    def release(self, room_id: int, websocket: WebSocket, sent_ids: Iterable[int] = ()):
+        """hold 상태 소켓의 라이브 송신 시작. replay 로 보낸 sent_ids 는 중복이라 건너뜀."""
+        peer = self.active_connections.get(room_id, {}).get(websocket)
+        if peer is None or peer.task is not None:
+            return
+        peer.skip_ids = frozenset(sent_ids)
+        peer.start()
+
     def disconnect(self, room_id: int, websocket: WebSocket):
         conns = self.active_connections.get(room_id)
         if not conns:
             return
-        if websocket in conns:
-            conns.remove(websocket)
+        peer = conns.pop(websocket, None)
+        if peer:
+            peer.close()
+            self.counters["disconnected"] += 1
             print(f"[WS] Disconnected from room {room_id}. Left {len(conns)} clients.")
         if not conns:
             self.active_connections.pop(room_id, None)
 
-    async def broadcast(self, room_id: int, message: dict):
-        conns = self.active_connections.get(room_id, [])
-        # 에러 방지용으로 한 번 복사본 iteration
-        for ws in list(conns):
+    def kick(self, room_id: int, websocket: WebSocket, code: int = status.WS_1008_POLICY_VIOLATION):
+        """서버 쪽에서 연결 정리 + close 프레임 전송 (close도 제한 시간 안에서만 시도)"""
+        self.disconnect(room_id, websocket)
+        self.counters["kicked"] += 1
+
+        async def _close():
             try:
-                await ws.send_json(message)
+                await asyncio.wait_for(websocket.close(code=code), timeout=WS_SEND_TIMEOUT)
+            except Exception:
+                pass
+
+        task = asyncio.create_task(_close())
+        self._bg_tasks.add(task)
+        task.add_done_callback(self._bg_tasks.discard)
+
+    def send(self, room_id: int, websocket: WebSocket, message: dict) -> None:
+        """이 소켓 하나에만 보냄. writer 큐를 거치므로 라이브 프레임과 순서가 섞이지 않음."""
+        peer = self.active_connections.get(room_id, {}).get(websocket)
+        if peer is None:
+            return
+        if not peer.enqueue(codec.encode(message, peer.format)):
+            self.kick(room_id, websocket, code=status.WS_1013_TRY_AGAIN_LATER)
+
+    def touch(self, room_id: int, websocket: WebSocket):
+        """클라이언트에서 프레임을 받을 때마다 호출 (pong 포함)."""
+        peer = self.active_connections.get(room_id, {}).get(websocket)
+        if peer is not None:
+            peer.last_seen = time.monotonic()
+
+    async def _reaper(self):
+        """
+        주기적으로
+        - writer 가 죽었거나 송신 큐가 IDLE_TIMEOUT 넘게 안 빠지는 소켓 정리 (모든 소켓)
+        - 하트비트 소켓: ping 큐잉, IDLE_TIMEOUT 넘게 아무 프레임도 안 보낸 소켓 정리
+        """
+        while True:
+            await asyncio.sleep(WS_PING_INTERVAL)
+            try:
+                now = time.monotonic()
+                pings = {"json": _PING}
+                for room_id, conns in list(self.active_connections.items()):
+                    for ws, peer in list(conns.items()):
+                        if peer.task is None:
+                            continue  # replay 중 (hold)
+                        stuck = peer.task.done() or (
+                            not peer.queue.empty() and now - peer.last_progress > WS_IDLE_TIMEOUT
+                        )
+                        idle = peer.heartbeat and now - peer.last_seen > WS_IDLE_TIMEOUT
+                        if stuck or idle:
+                            print(f"[WS] {'stuck' if stuck else 'idle'} client in room {room_id}, reaping")
+                            self.counters["reaped"] += 1
+                            self.kick(room_id, ws, code=status.WS_1001_GOING_AWAY)
+                            continue
+                        if not peer.heartbeat:
+                            continue
+                        ping = pings.get(peer.format)
+                        if ping is None:
+                            ping = pings[peer.format] = codec.transcode(_PING, peer.format)
+                        if not peer.enqueue(ping):
+                            self.kick(room_id, ws, code=status.WS_1013_TRY_AGAIN_LATER)
             except Exception as e:
-                print(f"[WS] broadcast error: {e}")
-                self.disconnect(room_id, ws)
+                print(f"[WS] reaper error: {e}")
+
+    def stats(self) -> dict:
+        """이 워커가 들고 있는 소켓 수 (방별/전체) + 송신 큐 적체량."""
+        rooms = {room_id: len(conns) for room_id, conns in self.active_connections.items()}
+        queued = sum(peer.queue.qsize() for conns in self.active_connections.values() for peer in conns.values())
+        return {
+            "pid": os.getpid(),
+            "connections": sum(rooms.values()),
+            "rooms": len(rooms),
+            "per_room": rooms,
+            "queued_frames": queued,
+            **self.counters,
+        }
+
+    def add_listener(self, listener: Callable[[int, str], None]):
+        self._listeners.append(listener)
+
+    def add_resync_listener(self, listener: Callable[[], None]):
+        self._resync_listeners.append(listener)
+
+    def add_control_listener(self, op: str, listener: Callable[[int, dict], None]):
+        self._control_listeners.setdefault(op, []).append(listener)
+
+    def signal(self, room_id: int, op: str, **fields):
+        """
+        제어 이벤트 (캐시 무효화 등) 를 모든 워커에 전달.
+        이 워커에서는 바로(동기로) 처리하고, 다른 워커에는 백플레인으로 보냄.
+        동기 라우터(스레드풀)에서 불러도 됨.
+        """
+        event = {"op": op, **fields}
+        self._apply_control(room_id, event)
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return  # 시작 전(스크립트 등) → 이 프로세스만
+        coro = self.backplane.publish_control(room_id, codec.dumps(event))
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            task = loop.create_task(coro)
+            self._bg_tasks.add(task)
+            task.add_done_callback(self._bg_tasks.discard)
+        else:
+            asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def _on_control(self, room_id: int, data: str):
+        try:
+            event = codec.loads(data)
+        except ValueError:
+            return
+        if isinstance(event, dict):
+            self._apply_control(room_id, event)
+
+    def _apply_control(self, room_id: int, event: dict):
+        for listener in self._control_listeners.get(event.get("op"), ()):
+            try:
+                listener(room_id, event)
+            except Exception as e:
+                print(f"[WS] control listener error: {e}")
+
+    def _resync(self):
+        """백플레인 재접속 후: 끊긴 동안 다른 워커 메시지를 놓쳤을 수 있음"""
+        for listener in self._resync_listeners:
+            try:
+                listener()
+            except Exception as e:
+                print(f"[WS] resync listener error: {e}")
+        # 이 워커의 소켓은 끊어서 last_seen_id 로 재접속 → 놓친 메시지 replay 받게 함
+        kicked = 0
+        for room_id, conns in list(self.active_connections.items()):
+            for ws in list(conns):
+                self.kick(room_id, ws, code=status.WS_1012_SERVICE_RESTART)
+                kicked += 1
+        if kicked:
+            print(f"[WS] backplane resync: closed {kicked} sockets for replay")
+
+    async def broadcast(self, room_id: int, message: dict | str, seq: int | None = None):
+        """seq: 저장된 채팅 메시지 id (재접속 replay 와 중복 제거용), 이벤트류는 None"""
+        # JSON 인코딩은 여기서 한 번만 → 방 인원수와 상관없이 직렬화 비용 O(1)
+        data = message if isinstance(message, str) else codec.dumps(message)
+        # 백플레인을 거쳐서 모든 워커의 해당 방 소켓으로 전달
+        await self.backplane.publish(room_id, data, seq)
+
+    async def _deliver_local(self, room_id: int, message: str, seq: int | None = None):
+        # 소켓이 없는 방이라도 listener(히스토리 캐시 등)에는 알려줌
+        for listener in self._listeners:
+            try:
+                listener(room_id, message)
+            except Exception as e:
+                print(f"[WS] listener error: {e}")
+
+        conns = self.active_connections.get(room_id)
+        if not conns:
+            return
+        # 형식별 인코딩은 브로드캐스트당 한 번씩만 (json 은 받은 텍스트 그대로)
+        frames = {"json": message}
+        # 큐에 넣기만 하므로 방 크기와 상관없이 여기서 기다리는 일 없음
+        for ws, peer in list(conns.items()):
+            frame = frames.get(peer.format)
+            if frame is None:
+                frame = frames[peer.format] = codec.transcode(message, peer.format)
+            if not peer.enqueue(frame, seq):
+                print(f"[WS] slow consumer in room {room_id}, disconnecting")
+                self.kick(room_id, ws, code=status.WS_1013_TRY_AGAIN_LATER)
 
 manager = ConnectionManager()
@@ -0,0 +1,109 @@
+# app/websocket/membership.py
+"""
+채팅방 멤버십 인덱스 (프로세스 메모리): room_id -> {user_id, ...}
+
+- 그룹 채팅방이면 GroupMember, 아니면 RoomMember 기준 (둘 다 합쳐서 봄)
+- 방별로 처음 한 번만 DB 에서 읽고, 이후 체크는 set 조회 O(1)
+- join_room / join_by_invite / leave_group 에서 바로 갱신
+- 다른 워커에서 일어난 변경은
+    · 가입: 캐시에 없는 유저면 MEMBERSHIP_MISS_RELOAD 초 이상 지난 경우에만 다시 읽음
+    · 탈퇴: MEMBERSHIP_TTL 이 지나면 다시 읽음
+"""
+import os
+import threading
+import time
+
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models.group_member import GroupMember
+from app.models.room import ChatRoom, RoomMember
+
+MEMBERSHIP_TTL = float(os.getenv("MEMBERSHIP_TTL", "60"))
+MEMBERSHIP_MISS_RELOAD = float(os.getenv("MEMBERSHIP_MISS_RELOAD", "2"))
+
+
+class _RoomMembers:
+    __slots__ = ("user_ids", "group_id", "loaded_at")
+
+    def __init__(self, user_ids: set[int], group_id: int | None):
+        self.user_ids = user_ids
+        self.group_id = group_id
+        self.loaded_at = time.monotonic()
+
+
+class RoomMembershipIndex:
+    def __init__(self, ttl: float = MEMBERSHIP_TTL, miss_reload: float = MEMBERSHIP_MISS_RELOAD):
+        self.ttl = ttl
+        self.miss_reload = miss_reload
+        self._rooms: dict[int, _RoomMembers] = {}
+        self._group_rooms: dict[int, int] = {}  # group_id -> room_id
+        self._lock = threading.Lock()
+
+    def is_member_cached(self, room_id: int, user_id: int) -> bool | None:
+        """DB 없이 답할 수 있으면 True/False, 모르면 None (→ check() 로)."""
+        with self._lock:
+            entry = self._rooms.get(room_id)
+            if entry is None:
+                return None
+            age = time.monotonic() - entry.loaded_at
+            if age > self.ttl:
+                return None
+            if user_id in entry.user_ids:
+                return True
+            # 다른 워커에서 막 가입했을 수 있으니 오래된 캐시면 다시 확인
+            return None if age > self.miss_reload else False
+
+    def check(self, room_id: int, user_id: int) -> bool:
+        """필요하면 DB 에서 다시 읽어서 확인 (동기 → 스레드풀에서 호출)."""
+        cached = self.is_member_cached(room_id, user_id)
+        if cached is not None:
+            return cached
+        return user_id in self._load(room_id)
+
+    def _load(self, room_id: int) -> set[int]:
+        db = SessionLocal()
+        try:
+            group_id = db.scalar(select(ChatRoom.group_id).where(ChatRoom.id == room_id))
+            user_ids = set(
+                db.scalars(select(RoomMember.user_id).where(RoomMember.room_id == room_id)).all()
+            )
+            if group_id is not None:
+                user_ids.update(
+                    db.scalars(select(GroupMember.user_id).where(GroupMember.group_id == group_id)).all()
+                )
+        finally:
+            db.close()
+
+        with self._lock:
+            self._rooms[room_id] = _RoomMembers(user_ids, group_id)
+            if group_id is not None:
+                self._group_rooms[group_id] = room_id
+        return user_ids
+
+    # ── 갱신 (라우터에서 커밋 후 호출) ─────────────────────
+    def add(self, room_id: int, user_id: int) -> None:
+        with self._lock:
+            entry = self._rooms.get(room_id)
+            if entry is not None:
+                entry.user_ids.add(user_id)
+
+    def remove(self, room_id: int, user_id: int) -> None:
+        with self._lock:
+            entry = self._rooms.get(room_id)
+            if entry is not None:
+                entry.user_ids.discard(user_id)
+
+    def add_group_member(self, group_id: int, user_id: int) -> None:
+        room_id = self._group_rooms.get(group_id)
+        if room_id is not None:
+            self.add(room_id, user_id)
+
+    def invalidate(self, room_id: int) -> None:
+        with self._lock:
+            entry = self._rooms.pop(room_id, None)
+            if entry is not None and entry.group_id is not None:
+                self._group_rooms.pop(entry.group_id, None)
+
+
+membership_index = RoomMembershipIndex()